@@ -0,0 +1,106 @@
+"""
+Benchmark of the CPU cost of the lookup crawl in `GoogleBook`.
+
+The crawl is driven directly with synthetic lookup responses, so no network
+is involved. Each response lists a window of pages with sources, plus the
+last page of the book, like the responses from Google Books do. Since each
+response has the same size, the time spent per page should stay flat as the
+book grows; if it grows with the size of the book, the crawl has become
+superlinear.
+
+The sizes are crawled in `--repeat` rounds, each going through every size in
+turn, and the growth is the median over the rounds of the per-page cost at
+the largest size against the smallest. Comparing runs from the same round
+keeps a slower spell of the machine from landing on a single size. Runs are
+timed in CPU time with the garbage collector paused, as neither other
+processes nor collections are the crawl's own cost.
+
+Usage: python -m benchmarks.crawl [--pages 20000] [--window 8] [--repeat 7]
+"""
+import gc
+import io
+import sys
+import time
+import argparse
+import statistics
+import contextlib
+
+from gbooks_dl.books.providers.google.book import GoogleBook, _PageId
+
+# The per-page time at the largest size may be at most this many times the
+# per-page time at the smallest size.
+LINEARITY_BUDGET = 1.5
+
+
+def synthetic_response(page: _PageId, num_pages: int, window: int) -> dict:
+    first = max(page.num, 1)
+    last = min(first + window, num_pages + 1)
+    res_pages = [
+        {'pid': f'PA{n}', 'src': f'https://books.example/content?pg=PA{n}'}
+        for n in range(first, last)
+    ]
+    res_pages.append({'pid': f'PA{num_pages}'})
+    return {'page': res_pages}
+
+
+def crawl(num_pages: int, window: int) -> tuple[int, int]:
+    """
+    Runs a whole crawl over a book of `num_pages` pages.
+    Returns the number of lookups made and the number of pages found.
+    """
+    book = GoogleBook('https://books.google.com/books?id=BENCHMARK')
+    lookups = 0
+    gen = book._crawl()
+    lookup = next(gen)
+    try:
+        while True:
+            lookups += 1
+            pg = lookup.url.split('pg=')[1].split('&')[0]
+            page = _PageId.from_id_str(pg)
+            if page.kind_str != 'PA':
+                page = _PageId(kind=3, num=1)
+            lookup = gen.send(synthetic_response(page, num_pages, window))
+    except StopIteration as stop:
+        return lookups, len(stop.value)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--pages', type=int, default=20000)
+    arg_parser.add_argument('--window', type=int, default=8)
+    arg_parser.add_argument('--repeat', type=int, default=7)
+    args = arg_parser.parse_args(argv)
+
+    sizes = [args.pages // 8, args.pages // 4, args.pages // 2, args.pages]
+    counts = {}
+    times = {size: [] for size in sizes}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(max(1, args.repeat)):
+            for size in sizes:
+                gc.collect()
+                gc.disable()
+                try:
+                    start = time.process_time()
+                    counts[size] = crawl(size, args.window)
+                    times[size].append(time.process_time() - start)
+                finally:
+                    gc.enable()
+
+    print(f"{'pages':>8} {'lookups':>8} {'found':>8} {'seconds':>9} {'us/page':>9}")
+    for size in sizes:
+        lookups, found = counts[size]
+        elapsed = statistics.median(times[size])
+        print(f'{size:>8} {lookups:>8} {found:>8} {elapsed:>9.3f} {elapsed / size * 1e6:>9.1f}')
+
+    ratio = statistics.median(
+        (largest / sizes[-1]) / (smallest / sizes[0])
+        for smallest, largest in zip(times[sizes[0]], times[sizes[-1]])
+    )
+    ok = ratio <= LINEARITY_BUDGET
+    print(f'Per-page cost grew {ratio:.2f}x from {sizes[0]} to {sizes[-1]} pages '
+          f'(budget {LINEARITY_BUDGET}x): {"OK" if ok else "FAIL"}')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
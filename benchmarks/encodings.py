@@ -0,0 +1,59 @@
+"""
+Benchmark of the content encodings gbooks-dl accepts, on lookup responses.
+
+Every lookup the stand-in book answers is compressed with each encoding
+available to both the stand-in server and gbooks-dl, and reported as the
+bytes a lookup takes on the wire and the time gbooks-dl takes to
+decompress it. Smaller lookups are what shorten a crawl on a slow link.
+
+Usage: python -m benchmarks.encodings [--pages 400] [--window 8] [--runs 5]
+"""
+import sys
+import json
+import time
+import argparse
+
+from gbooks_dl.decompress import available_decompressors, decompress
+
+from benchmarks.server import BookConfig, StandInBook, COMPRESSORS
+
+IMAGE_URL = 'https://books.google.com/books/content?id=BENCHMARK&img=1&zoom=3&hl=en&sig=ACfU3U0'
+
+
+def lookup_payloads(config: BookConfig) -> list[bytes]:
+    book = StandInBook(config)
+    return [json.dumps(book.lookup(pid, IMAGE_URL)).encode() for pid in book.page_ids]
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--runs', type=int, default=5,
+                            help="Decompress every lookup this many times, and keep the fastest.")
+    BookConfig.add_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    payloads = lookup_payloads(BookConfig.from_args(args))
+    raw_size = sum(map(len, payloads)) / len(payloads)
+    print(f'{len(payloads)} lookups, {raw_size:.0f} bytes each on average')
+    print(f"{'encoding':<10} {'bytes':>8} {'ratio':>7} {'decode us':>10}")
+    print(f"{'identity':<10} {raw_size:>8.0f} {1:>7.2f} {0:>10.1f}")
+
+    ok = True
+    for encoding in available_decompressors():
+        if encoding not in COMPRESSORS:
+            continue
+        compressed = [COMPRESSORS[encoding](payload) for payload in payloads]
+        fastest = float('inf')
+        for _ in range(max(1, args.runs)):
+            start = time.perf_counter()
+            decoded = [decompress(data, encoding) for data in compressed]
+            fastest = min(fastest, time.perf_counter() - start)
+        ok = ok and decoded == payloads
+        size = sum(map(len, compressed)) / len(compressed)
+        print(f'{encoding:<10} {size:>8.0f} {raw_size / size:>7.2f} {fastest / len(payloads) * 1e6:>10.1f}'
+              f"{'' if decoded == payloads else '  MISMATCH'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark of the time taken to import gbooks-dl's modules.
+
+Each module is imported in a fresh interpreter run with `-X importtime`, and
+the fastest of several runs is compared against the module's budget. Every
+module is also checked for heavy modules it must not pull in, e.g. picking a
+provider mustn't import every provider. That check doesn't depend on the
+speed of the machine, unlike the times, which can be scaled to suit it with
+--budget-scale.
+
+Usage: python -m benchmarks.importtime [--runs 5] [--budget-scale 1.0] [--top 5]
+"""
+import sys
+import argparse
+import subprocess
+from typing import NamedTuple
+
+
+class ImportBudget(NamedTuple):
+    module: str
+    # The most the module's import may take, in milliseconds
+    budget_ms: float
+    # Modules (along with their submodules) it mustn't import
+    forbidden: tuple[str, ...] = ()
+
+
+BUDGETS = (
+    # What the CLI needs to pick a provider for a URL
+    ImportBudget('gbooks_dl.parser', 25.0, forbidden=(
+        'gbooks_dl.books.providers.google',
+        'gbooks_dl.books.base',
+        'gbooks_dl.utils',
+        'asyncio',
+    )),
+    ImportBudget('gbooks_dl.useragent', 40.0),
+    ImportBudget('gbooks_dl.utils', 100.0, forbidden=('gbooks_dl.useragent',)),
+    ImportBudget('gbooks_dl.books.providers.google.book', 250.0),
+    # What `python -m gbooks_dl` loads for a sync run, which has no use for
+    # the async client, or asyncio
+    ImportBudget('gbooks_dl.pipeline', 300.0, forbidden=(
+        'gbooks_dl.aio',
+        'gbooks_dl.http2',
+        'asyncio',
+    )),
+    ImportBudget('gbooks_dl.__main__', 50.0, forbidden=(
+        'gbooks_dl.pipeline',
+        'gbooks_dl.books',
+        'asyncio',
+    )),
+)
+
+
+class ImportLine(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(stderr: str) -> list[ImportLine]:
+    lines = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            # The header line
+            continue
+        lines.append(ImportLine(name.strip(), int(self_us), int(cumulative_us)))
+    return lines
+
+
+def time_import(module: str) -> list[ImportLine]:
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(proc.stderr)
+
+
+def is_forbidden(module: str, forbidden: tuple[str, ...]) -> bool:
+    return any(module == f or module.startswith(f + '.') for f in forbidden)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--runs', type=int, default=5)
+    arg_parser.add_argument('--budget-scale', type=float, default=1.0,
+                            help="Multiply every time budget by this, e.g. for a slow machine.")
+    arg_parser.add_argument('--top', type=int, default=5,
+                            help="Show the N gbooks_dl modules slowest to import by themselves.")
+    args = arg_parser.parse_args(argv)
+
+    ok = True
+    print(f"{'module':<40} {'ms':>8} {'budget':>8}  result")
+    for target in BUDGETS:
+        # The first run may have to compile the modules, so it isn't counted
+        time_import(target.module)
+        runs = [time_import(target.module) for _ in range(max(1, args.runs))]
+        fastest = min(
+            runs,
+            key=lambda lines: next(line.cumulative_us for line in lines if line.module == target.module)
+        )
+        total_ms = next(line.cumulative_us for line in fastest if line.module == target.module) / 1000
+        budget_ms = target.budget_ms * args.budget_scale
+        problems = []
+        if total_ms > budget_ms:
+            problems.append('over budget')
+        imported_forbidden = sorted({
+            line.module for line in fastest if is_forbidden(line.module, target.forbidden)
+        })
+        if imported_forbidden:
+            problems.append(f"imports {', '.join(imported_forbidden)}")
+        ok = ok and not problems
+        print(f'{target.module:<40} {total_ms:>8.1f} {budget_ms:>8.1f}  {"; ".join(problems) or "OK"}')
+
+        slowest = sorted(
+            (line for line in fastest if line.module.startswith('gbooks_dl')),
+            key=lambda line: line.self_us,
+            reverse=True
+        )
+        for line in slowest[:args.top]:
+            print(f'    {line.module:<36} {line.self_us / 1000:>8.1f} ms by itself')
+
+    print('Import times: OK' if ok else 'Import times: FAIL')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,429 @@
+"""
+A local stand-in for Google Books, for benchmarking gbooks-dl without
+touching the real service.
+
+It serves the two endpoints gbooks-dl uses:
+
+    /books?id=...&pg=...&jscmd=click3   lookups, as JSON
+    /books/content?id=...&pg=...        page images
+
+The book's size, the gaps in its preview, the share of pages served as
+'page not available' placeholders, the content encodings responses may be
+compressed with, response latency and error rate are all configurable. Point gbooks-dl at the server by setting
+GBOOKS_DL_GOOGLE_BASE_URL to its address.
+
+GET /_stats returns counts of the connections accepted, the requests served
+and the bytes sent.
+
+With --http2, the stand-in speaks HTTP/2 instead, without TLS, to clients
+which know to expect it. That needs the h2 package.
+
+Usage: python -m benchmarks.server [--port 8000] [--http2] [--pages 400] ...
+"""
+import gzip
+import zlib
+import json
+import time
+import random
+import struct
+import hashlib
+import argparse
+import threading
+import socketserver
+import urllib.parse
+from typing import NamedTuple, Optional, Callable
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# SOI, a JFIF APP0 segment and an 800x1200 three-component SOF0 segment.
+_JPEG_HEADERS = (
+    b'\xff\xd8'
+    + b'\xff\xe0' + struct.pack('>H5sBBBHHBB', 16, b'JFIF', 1, 1, 0, 1, 1, 0, 0)
+    + b'\xff\xc0' + struct.pack('>HBHHB', 17, 8, 1200, 800, 3) + bytes([1, 0x22, 0, 2, 0x11, 1, 3, 0x11, 1])
+)
+
+# Served in place of a page image which isn't part of the preview.
+PLACEHOLDER_IMAGE = b'\x89PNG\r\n\x1a\n' + b'gbooks-dl benchmark placeholder' + bytes(2048)
+
+
+class BookConfig(NamedTuple):
+    pages: int = 400
+    front_pages: int = 4
+    window: int = 8
+    gap_every: int = 0
+    gap_length: int = 0
+    placeholder_rate: float = 0.0
+    image_size: int = 64 * 1024
+    gzip: bool = False
+    encodings: str = ''
+    latency: float = 0.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    @classmethod
+    def add_arguments(cls, arg_parser: argparse.ArgumentParser) -> None:
+        defaults = cls()
+        arg_parser.add_argument('--pages', type=int, default=defaults.pages,
+                                help="Number of PA pages in the book.")
+        arg_parser.add_argument('--front-pages', type=int, default=defaults.front_pages,
+                                help="Number of PP pages before the PA pages.")
+        arg_parser.add_argument('--window', type=int, default=defaults.window,
+                                help="Number of pages with a source returned by each lookup.")
+        arg_parser.add_argument('--gap-every', type=int, default=defaults.gap_every,
+                                help="Leave a gap in the preview every N pages (0 for no gaps).")
+        arg_parser.add_argument('--gap-length', type=int, default=defaults.gap_length,
+                                help="Number of pages missing from each gap.")
+        arg_parser.add_argument('--placeholder-rate', type=float, default=defaults.placeholder_rate,
+                                help="Share of listed pages whose image is a placeholder.")
+        arg_parser.add_argument('--image-size', type=int, default=defaults.image_size,
+                                help="Size of each page image in bytes.")
+        arg_parser.add_argument('--gzip', action='store_true',
+                                help="gzip-encode every response.")
+        arg_parser.add_argument('--encodings', default=defaults.encodings,
+                                help="Comma-separated content encodings in order of preference, e.g. "
+                                     "'zstd,br,gzip'. Each response is compressed with the first the "
+                                     "client accepts. br and zstd need brotli and zstandard.")
+        arg_parser.add_argument('--latency', type=float, default=defaults.latency,
+                                help="Seconds to wait before answering each request.")
+        arg_parser.add_argument('--error-rate', type=float, default=defaults.error_rate,
+                                help="Share of requests answered with a 500 error.")
+        arg_parser.add_argument('--seed', type=int, default=defaults.seed)
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> 'BookConfig':
+        return cls(**{field: getattr(args, field) for field in cls._fields})
+
+    def to_argv(self) -> list[str]:
+        argv = []
+        for field, value in self._asdict().items():
+            flag = '--' + field.replace('_', '-')
+            if isinstance(value, bool):
+                argv += [flag] if value else []
+            else:
+                argv += [flag, str(value)]
+        return argv
+
+
+class StandInBook:
+    """
+    The pages of the stand-in book, and which of them are in its preview.
+    """
+    def __init__(self, config: BookConfig):
+        self.config = config
+        rng = random.Random(config.seed)
+        self.page_ids = (
+            [f'PP{n}' for n in range(1, config.front_pages + 1)]
+            + [f'PA{n}' for n in range(1, config.pages + 1)]
+        )
+        self._index = {pid: idx for idx, pid in enumerate(self.page_ids)}
+        self.available = [not self._in_gap(idx) for idx in range(len(self.page_ids))]
+        self.placeholders = {
+            pid for pid, available in zip(self.page_ids, self.available)
+            if available and rng.random() < config.placeholder_rate
+        }
+
+    def _in_gap(self, idx: int) -> bool:
+        c = self.config
+        if c.gap_every <= 0 or c.gap_length <= 0:
+            return False
+        return idx % (c.gap_every + c.gap_length) >= c.gap_every
+
+    def lookup(self, pg: str, image_url: str) -> dict:
+        """
+        Lists the first `window` available pages from `pg` onwards with their
+        sources, followed by the last page of the book, without one.
+        """
+        start = self._index.get(pg, 0)
+        res_pages = []
+        for idx in range(start, len(self.page_ids)):
+            if len(res_pages) == self.config.window:
+                break
+            if self.available[idx]:
+                pid = self.page_ids[idx]
+                res_pages.append({'pid': pid, 'src': f'{image_url}&pg={pid}'})
+        if not res_pages or res_pages[-1]['pid'] != self.page_ids[-1]:
+            res_pages.append({'pid': self.page_ids[-1]})
+        return {'page': res_pages}
+
+    def image(self, pg: str) -> tuple[bytes, str]:
+        if pg in self.placeholders or pg not in self._index:
+            return PLACEHOLDER_IMAGE, 'image/png'
+        # Real JPEG headers, so the image's size can be read, followed by
+        # filler which differs for every page
+        filler = hashlib.sha256(pg.encode()).digest()
+        body_size = max(0, self.config.image_size - len(_JPEG_HEADERS) - 2)
+        body = (filler * (body_size // len(filler) + 1))[:body_size]
+        return _JPEG_HEADERS + body + b'\xff\xd9', 'image/jpeg'
+
+
+def _compressors() -> dict[str, Callable[[bytes], bytes]]:
+    compressors = {
+        'gzip': lambda data: gzip.compress(data, compresslevel=1),
+        'deflate': lambda data: zlib.compress(data, 1),
+    }
+    try:
+        import brotli
+        compressors['br'] = lambda data: brotli.compress(data, quality=4)
+    except ImportError:
+        ...
+    try:
+        import zstandard
+        compressors['zstd'] = zstandard.ZstdCompressor(level=3).compress
+    except ImportError:
+        ...
+    return compressors
+
+
+COMPRESSORS = _compressors()
+
+
+class _Stats:
+    def __init__(self):
+        self.connections = 0
+        self.lookups = 0
+        self.images = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+
+    def add(self, kind: Optional[str], nbytes: int) -> None:
+        with self._lock:
+            if kind is not None:
+                setattr(self, kind, getattr(self, kind) + 1)
+            self.bytes_sent += nbytes
+
+    def as_dict(self) -> dict:
+        return {k: v for k, v in vars(self).items() if not k.startswith('_')}
+
+
+class _Reply(NamedTuple):
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class _StandIn:
+    """
+    What the HTTP/1.1 and HTTP/2 servers share: the book, its stats and the
+    replies to requests.
+    """
+    def __init__(self, book: StandInBook):
+        self.book = book
+        self.stats = _Stats()
+        self._rng = random.Random(book.config.seed)
+        self._rng_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def should_fail(self) -> bool:
+        with self._rng_lock:
+            return self._rng.random() < self.book.config.error_rate
+
+    def respond(self, path: str, accept_encoding: str = '') -> _Reply:
+        config = self.book.config
+        url = urllib.parse.urlsplit(path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+
+        if url.path == '/_stats':
+            return self._reply(200, json.dumps(self.stats.as_dict()).encode(), 'application/json')
+
+        if config.latency:
+            time.sleep(config.latency)
+        if self.should_fail():
+            self.stats.add('errors', 0)
+            return self._reply(500, b'', 'text/plain')
+
+        if url.path == '/books' and query.get('jscmd') == 'click3':
+            image_url = f'{self.base_url}/books/content?id={query.get("id", "")}&img=1'
+            res = self.book.lookup(query.get('pg', ''), image_url)
+            body = json.dumps(res).encode()
+            return self._reply(200, body, 'application/json; charset=UTF-8', 'lookups',
+                               cookie='NID=benchmark; path=/; HttpOnly', accept_encoding=accept_encoding)
+        elif url.path == '/books/content':
+            body, content_type = self.book.image(query.get('pg', ''))
+            return self._reply(200, body, content_type, 'images', accept_encoding=accept_encoding)
+        return self._reply(404, b'', 'text/plain')
+
+    def _choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        if self.book.config.gzip:
+            return 'gzip'
+        accepted = {e.split(';')[0].strip().lower() for e in accept_encoding.split(',')}
+        for encoding in self.book.config.encodings.split(','):
+            encoding = encoding.strip()
+            if encoding in accepted and encoding in COMPRESSORS:
+                return encoding
+        return None
+
+    def _reply(self, status: int, body: bytes, content_type: str, kind: Optional[str] = None,
+               cookie: Optional[str] = None, accept_encoding: str = '') -> _Reply:
+        headers = [('Content-Type', content_type)]
+        encoding = self._choose_encoding(accept_encoding) if body and kind is not None else None
+        if encoding is not None:
+            body = COMPRESSORS[encoding](body)
+            headers.append(('Content-Encoding', encoding))
+        if cookie is not None:
+            headers.append(('Set-Cookie', cookie))
+        headers.append(('Content-Length', str(len(body))))
+        self.stats.add(kind, len(body))
+        return _Reply(status, headers, body)
+
+
+class StandInServer(_StandIn, ThreadingHTTPServer):
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops bursts of new connections,
+    # which then wait a second to be retried
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], book: StandInBook):
+        ThreadingHTTPServer.__init__(self, address, _Handler)
+        _StandIn.__init__(self, book)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: StandInServer
+
+    def log_message(self, *a):
+        ...
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add('connections', 0)
+
+    def do_GET(self):
+        reply = self.server.respond(self.path, self.headers.get('Accept-Encoding', ''))
+        self.send_response(reply.status)
+        for name, value in reply.headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(reply.body)
+
+
+class StandInHttp2Server(_StandIn, socketserver.ThreadingTCPServer):
+    """
+    Serves the stand-in over HTTP/2 without TLS, to clients which know it
+    speaks HTTP/2 up front ('prior knowledge'). Each request is answered on a
+    thread of its own, so the responses on a connection overlap.
+
+    Needs the h2 package.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], book: StandInBook):
+        # Fail now, rather than on the first connection, if h2 isn't installed
+        import h2.connection
+        socketserver.ThreadingTCPServer.__init__(self, address, _Http2Handler)
+        _StandIn.__init__(self, book)
+
+
+class _Http2Handler(socketserver.BaseRequestHandler):
+    server: StandInHttp2Server
+
+    def handle(self):
+        import h2.config
+        import h2.events
+        import h2.connection
+        import h2.exceptions
+
+        self.server.stats.add('connections', 0)
+        self._conn = h2.connection.H2Connection(
+            h2.config.H2Configuration(client_side=False, header_encoding='latin-1')
+        )
+        self._cond = threading.Condition()
+        self._reset: set[int] = set()
+        self._closed = False
+        with self._cond:
+            self._conn.initiate_connection()
+            self._flush()
+        try:
+            while data := self.request.recv(65536):
+                with self._cond:
+                    for event in self._conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            threading.Thread(
+                                target=self._respond,
+                                args=(event.stream_id, dict(event.headers)),
+                                daemon=True
+                            ).start()
+                        elif isinstance(event, h2.events.StreamReset):
+                            self._reset.add(event.stream_id)
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    self._flush()
+                    self._cond.notify_all()
+        except (OSError, h2.exceptions.ProtocolError):
+            ...
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+
+    def _respond(self, stream_id: int, headers: dict) -> None:
+        import h2.exceptions
+
+        reply = self.server.respond(headers[':path'], headers.get('accept-encoding', ''))
+        body = memoryview(reply.body)
+        try:
+            with self._cond:
+                self._conn.send_headers(
+                    stream_id,
+                    [(':status', str(reply.status))] + [(k.lower(), v) for k, v in reply.headers],
+                    end_stream=not body
+                )
+                self._flush()
+            while body:
+                with self._cond:
+                    while not self._closed and stream_id not in self._reset and (
+                        window := min(self._conn.local_flow_control_window(stream_id),
+                                      self._conn.max_outbound_frame_size)
+                    ) <= 0:
+                        self._cond.wait()
+                    if self._closed or stream_id in self._reset:
+                        return
+                    chunk, body = body[:window], body[window:]
+                    self._conn.send_data(stream_id, bytes(chunk), end_stream=not body)
+                    self._flush()
+        except (OSError, h2.exceptions.ProtocolError):
+            ...
+
+    def _flush(self) -> None:
+        data = self._conn.data_to_send()
+        if data:
+            self.request.sendall(data)
+
+
+def start_server(config: BookConfig, host: str = '127.0.0.1', port: int = 0,
+                 http2: bool = False) -> StandInServer | StandInHttp2Server:
+    """
+    Starts a stand-in server on a background thread and returns it.
+    """
+    server_class = StandInHttp2Server if http2 else StandInServer
+    server = server_class((host, port), StandInBook(config))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None) -> None:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8000)
+    arg_parser.add_argument('--http2', action='store_true',
+                            help="Speak HTTP/2 (with prior knowledge, without TLS) instead of HTTP/1.1.")
+    BookConfig.add_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    server_class = StandInHttp2Server if args.http2 else StandInServer
+    server = server_class((args.host, args.port), StandInBook(BookConfig.from_args(args)))
+    print(f'Serving a stand-in Google Books at {server.base_url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
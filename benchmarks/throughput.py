@@ -0,0 +1,170 @@
+"""
+End-to-end throughput benchmark of `pipeline()` against a local stand-in
+for Google Books.
+
+The stand-in (`benchmarks.server`) runs in a separate process, so it doesn't
+compete with gbooks-dl for the interpreter, and gbooks-dl is pointed at it
+through GBOOKS_DL_GOOGLE_BASE_URL. A whole book is then crawled and downloaded
+into a temporary folder, and the run is reported as pages per second,
+lookups per discovered page, bytes per second and the peak RSS of this process.
+
+Any option of `benchmarks.server` can be given to shape the book served.
+With --http2, the stand-in speaks HTTP/2 and gbooks-dl uses its HTTP/2
+transport, which needs the h2 package.
+
+Usage: python -m benchmarks.throughput [--jobs 8] [--prefetch] [--async | --http2] [--pages 400] ...
+"""
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tempfile
+import contextlib
+import subprocess
+import urllib.request
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from gbooks_dl.stats import run_stats
+from gbooks_dl.utils import mimetype_map
+from gbooks_dl.pipeline import pipeline, async_pipeline
+from gbooks_dl.ratelimit import AdaptiveRateLimiter
+from gbooks_dl.books.providers.google.book import BASE_URL_ENV_VAR
+from gbooks_dl.books.base.placeholder import PlaceholderSignature
+from gbooks_dl.books.providers.google.downloader import NOT_AVAILABLE_PAGES
+
+from benchmarks.server import BookConfig, PLACEHOLDER_IMAGE
+
+BOOK_ID = 'BENCHMARK'
+BOOK_URL = f'https://books.google.com/books?id={BOOK_ID}'
+
+# The stand-in serves this image in place of pages which aren't available
+NOT_AVAILABLE_PAGES.register(PlaceholderSignature.from_data(PLACEHOLDER_IMAGE, 'image/png'))
+
+
+class RunResult(NamedTuple):
+    elapsed: float
+    # The pages found by the crawl, and the pages of those saved
+    discovered: int
+    saved: int
+    # The stand-in server's counts of connections, requests and bytes sent
+    stats: dict
+    error: Optional[Exception]
+
+
+@contextlib.contextmanager
+def stand_in_server(config: BookConfig, http2: bool = False):
+    """
+    Runs the stand-in server in a subprocess and yields its base URL.
+    """
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.server', '--port', '0', *(['--http2'] if http2 else []),
+         *config.to_argv()],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    try:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError('The stand-in server failed to start.')
+        yield line.split()[-1]
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def get_server_stats(base_url: str, http2: bool = False) -> dict:
+    if http2:
+        from gbooks_dl.http2 import Http2Transport
+        with Http2Transport(prior_knowledge=True) as transport:
+            return json.loads(transport.fetch(f'{base_url}/_stats').read())
+    with urllib.request.urlopen(f'{base_url}/_stats') as res:
+        return json.load(res)
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux, but in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run(args: argparse.Namespace, dest: Path) -> None:
+    rate_limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.rate)
+    if args.use_async:
+        asyncio.run(async_pipeline(
+            BOOK_URL, dest, jobs=args.jobs, prefetch=args.prefetch, rate_limiter=rate_limiter
+        ))
+    elif args.http2:
+        # The stand-in speaks HTTP/2 without TLS, so there is nothing to negotiate it with
+        from gbooks_dl.http2 import Http2Transport
+        with Http2Transport(pool_size=args.jobs, rate_limiter=rate_limiter, prior_knowledge=True) as transport:
+            pipeline(BOOK_URL, dest, jobs=args.jobs, transport=transport, prefetch=args.prefetch)
+    else:
+        pipeline(BOOK_URL, dest, jobs=args.jobs, prefetch=args.prefetch, rate_limiter=rate_limiter)
+
+
+def add_arguments(arg_parser: argparse.ArgumentParser) -> None:
+    arg_parser.add_argument('-j', '--jobs', type=int, default=8)
+    arg_parser.add_argument('--prefetch', action='store_true')
+    arg_parser.add_argument('--rate', type=float, default=10000.0,
+                            help="Requests per second allowed by the rate limiter.")
+    BookConfig.add_arguments(arg_parser)
+
+
+def run_benchmark(args: argparse.Namespace) -> RunResult:
+    """
+    Downloads the stand-in book once, with the options in `args`.
+    """
+    config = BookConfig.from_args(args)
+    with stand_in_server(config, http2=args.http2) as base_url, tempfile.TemporaryDirectory() as dest:
+        os.environ[BASE_URL_ENV_VAR] = base_url
+        error = None
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            run_stats.reset()
+            start = time.perf_counter()
+            try:
+                run(args, Path(dest))
+            except Exception as exc:
+                error = exc
+            elapsed = time.perf_counter() - start
+        discovered = run_stats.counters['pages_discovered']
+        stats = get_server_stats(base_url, http2=args.http2)
+        # Only the page images, not the manifest or SHA256SUMS
+        image_extensions = {ext for mimetype, ext in mimetype_map().items() if mimetype.startswith('image/')}
+        saved = sum(1 for fp in Path(dest, BOOK_ID).iterdir() if fp.suffix in image_extensions)
+    return RunResult(elapsed, discovered, saved, stats, error)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(arg_parser)
+    transport = arg_parser.add_mutually_exclusive_group()
+    transport.add_argument('--async', dest='use_async', action='store_true')
+    transport.add_argument('--http2', action='store_true')
+    args = arg_parser.parse_args(argv)
+
+    elapsed, discovered, saved, stats, error = run_benchmark(args)
+    mode = 'async' if args.use_async else 'threads, HTTP/2' if args.http2 else 'threads'
+    print(f"mode:                 {mode}, {args.jobs} jobs{', prefetch' if args.prefetch else ''}")
+    print(f'seconds:              {elapsed:.3f}')
+    print(f'pages discovered:     {discovered} ({saved} saved)')
+    print(f'images requested:     {stats["images"]}')
+    print(f'lookups:              {stats["lookups"]}')
+    print(f'connections:          {stats["connections"]}')
+    print(f'errors injected:      {stats["errors"]}')
+    print(f'pages/sec:            {discovered / elapsed:.1f}')
+    print(f'lookups/page:         {stats["lookups"] / max(discovered, 1):.3f}')
+    print(f'MiB/sec:              {stats["bytes_sent"] / elapsed / (1024 * 1024):.2f}')
+    print(f'peak RSS:             {peak_rss_mib():.1f} MiB')
+    if error is not None:
+        print(f'The run failed: {error!r}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Benchmark comparing gbooks-dl's HTTP/1.1 and HTTP/2 transports.
+
+The same stand-in book is downloaded once over each transport, from a
+stand-in server speaking the matching protocol, and the runs are reported
+side by side. The difference shows best with latency, e.g. --latency 0.05,
+as that is what multiplexing many requests on one connection hides. The
+HTTP/2 run needs the h2 package, and is skipped without it.
+
+Any option of `benchmarks.throughput` can be given, other than --async.
+
+Usage: python -m benchmarks.transports [--jobs 8] [--latency 0.05] [--pages 400] ...
+"""
+import sys
+import argparse
+
+from gbooks_dl.transport import http2_available
+
+from benchmarks.throughput import add_arguments, run_benchmark
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+    args.use_async = False
+
+    backends = ['HTTP/1.1']
+    if http2_available():
+        backends.append('HTTP/2')
+    else:
+        print('h2 is not installed, so only HTTP/1.1 is run.')
+
+    ok = True
+    print(f"{'transport':<10} {'seconds':>8} {'pages/sec':>10} {'MiB/sec':>8} {'connections':>12}  result")
+    for backend in backends:
+        args.http2 = backend == 'HTTP/2'
+        elapsed, discovered, saved, stats, error = run_benchmark(args)
+        ok = ok and error is None
+        print(f"{backend:<10} {elapsed:>8.3f} {discovered / elapsed:>10.1f} "
+              f"{stats['bytes_sent'] / elapsed / (1024 * 1024):>8.2f} {stats['connections']:>12}  "
+              f"{'OK' if error is None else f'failed: {error!r}'}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,6 +2,15 @@
 import os
 import argparse
 
+from gbooks_dl.output.resolver import OUTPUT_FORMATS, FOLDER_FORMAT
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
 
 parser = argparse.ArgumentParser(
     prog="gbooks-dl",
@@ -13,15 +22,190 @@ parser.add_argument(
     nargs='?',
     help="A URL containing a preview-able book to be downloaded."
 )
+parser.add_argument(
+    '-b', '--batch',
+    metavar='FILE',
+    help="Download every book listed in FILE (one URL per line, or '-' to read from stdin) "
+         "in a single run."
+)
 parser.add_argument(
     '-f', '--output-folder',
     nargs='?',
     default=os.getcwd(),
-    help="The file folder in which the files containing the book previews should be saved."
+    help="The file folder in which the files containing the book previews should be saved. "
+         "Each book's pages are saved in a folder of their own inside it, named after the book's ID."
+)
+parser.add_argument(
+    '-j', '--jobs',
+    type=positive_int,
+    default=1,
+    help="The number of pages to download concurrently."
+)
+parser.add_argument(
+    '--prefetch',
+    action='store_true',
+    help="Speculatively request the lookups that are likely to come next while the "
+         "current one is in progress. Speeds up finding pages at the cost of extra requests."
+)
+parser.add_argument(
+    '--rate',
+    type=float,
+    default=10.0,
+    help="The number of requests per second to start at. The rate is raised while the "
+         "provider responds normally and lowered whenever it throttles us."
+)
+parser.add_argument(
+    '--max-rate',
+    type=float,
+    default=50.0,
+    help="The number of requests per second the rate will never be raised beyond."
+)
+parser.add_argument(
+    '--max-attempts',
+    type=int,
+    default=4,
+    help="The number of times a request that fails with a temporary error is attempted "
+         "before giving up on it."
+)
+parser.add_argument(
+    '--backoff-base',
+    type=float,
+    default=0.5,
+    help="The base, in seconds, of the exponential backoff between attempts."
+)
+parser.add_argument(
+    '--backoff-cap',
+    type=float,
+    default=30.0,
+    help="The longest time, in seconds, to wait between attempts."
+)
+parser.add_argument(
+    '--timeout',
+    type=float,
+    default=30.0,
+    help="The number of seconds a request may go without a response, or without receiving "
+         "more of its body, before it fails and is retried."
+)
+parser.add_argument(
+    '--cache-dir',
+    help="Cache lookup responses in this folder, so re-running a book doesn't repeat them."
+)
+parser.add_argument(
+    '--cache-ttl',
+    type=float,
+    default=24 * 60 * 60,
+    help="The number of seconds a cached lookup response stays valid for."
+)
+parser.add_argument(
+    '--cache-max-size',
+    type=int,
+    default=64,
+    help="The size in MiB the lookup cache may grow to before the least recently "
+         "used responses are evicted."
+)
+parser.add_argument(
+    '--format',
+    dest='output_format',
+    choices=OUTPUT_FORMATS,
+    default=FOLDER_FORMAT,
+    help="How to save each book: as a folder of page images, or as a single archive or PDF "
+         "named after the book's ID which the pages are written into as they arrive. Either "
+         "way, the checksums of the page images are written to a SHA256SUMS file: in the "
+         "book's folder, or next to its archive or PDF, e.g. ID.cbz.SHA256SUMS."
+)
+parser.add_argument(
+    '--cookie-jar',
+    metavar='FILE',
+    help="Keep the provider's cookies in FILE between runs, so each run carries on the "
+         "session of the one before it. Several runs may share the same FILE at once."
+)
+parser.add_argument(
+    '--store',
+    metavar='DIR',
+    help="Keep each page image once, named by its checksum, in DIR, and link to it from "
+         "the output folder. Pages shared between books or runs then take no extra space."
+)
+parser.add_argument(
+    '--stats-json',
+    metavar='FILE',
+    help="Write a report of the run's requests, latencies, bytes transferred and where "
+         "its time went to FILE as JSON ('-' for stdout)."
+)
+parser.add_argument(
+    '--http2',
+    action='store_true',
+    help="Send requests over HTTP/2 where the provider supports it, so every page in "
+         "flight shares one connection. Needs the h2 package (pip install 'gbooks-dl[http2]'); "
+         "without it, HTTP/1.1 is used. Can't be combined with --async."
+)
+parser.add_argument(
+    '--async',
+    dest='use_async',
+    action='store_true',
+    help="Make requests on a single asyncio event loop instead of a pool of threads. "
+         "--jobs then sets the number of requests in flight at once."
 )
 
 if __name__ == '__main__':
     args = parser.parse_args()
+    if args.URL is None and args.batch is None:
+        parser.error("a URL or --batch is required")
+    if args.http2 and args.use_async:
+        parser.error("--http2 can't be combined with --async")
+
+    cache = None
+    if args.cache_dir is not None:
+        from gbooks_dl.cache import LookupCache
+        cache = LookupCache(args.cache_dir, ttl=args.cache_ttl, max_size=args.cache_max_size * 1024 * 1024)
+
+    from gbooks_dl.ratelimit import AdaptiveRateLimiter
+    rate_limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.max_rate)
+
+    from gbooks_dl.retry import RetryPolicy
+    retry_policy = RetryPolicy(args.max_attempts, args.backoff_base, args.backoff_cap)
+
+    store = None
+    if args.store is not None:
+        from gbooks_dl.store import ContentStore
+        store = ContentStore(args.store)
+
+    cookie_jar = None
+    if args.cookie_jar is not None:
+        from gbooks_dl.cookiejar import CookieJar
+        cookie_jar = CookieJar(args.cookie_jar)
 
-    from gbooks_dl.pipeline import pipeline
-    pipeline(args.URL, args.output_folder)
+    options = dict(
+        jobs=args.jobs,
+        prefetch=args.prefetch,
+        cache=cache,
+        rate_limiter=rate_limiter,
+        retry_policy=retry_policy,
+        store=store,
+        output_format=args.output_format,
+        cookie_jar=cookie_jar,
+        timeout=args.timeout
+    )
+    if args.http2:
+        options['http2'] = True
+    try:
+        if args.batch is not None:
+            import sys
+            from gbooks_dl.batch import read_batch_urls, run_batch
+            if args.batch == '-':
+                urls = read_batch_urls(sys.stdin)
+            else:
+                with open(args.batch) as f:
+                    urls = read_batch_urls(f)
+            ok = run_batch(urls, args.output_folder, use_async=args.use_async, **options)
+            sys.exit(0 if ok else 1)
+        elif args.use_async:
+            import asyncio
+            from gbooks_dl.pipeline import async_pipeline
+            asyncio.run(async_pipeline(args.URL, args.output_folder, **options))
+        else:
+            from gbooks_dl.pipeline import pipeline
+            pipeline(args.URL, args.output_folder, **options)
+    finally:
+        if args.stats_json is not None:
+            from gbooks_dl.stats import run_stats
+            run_stats.write_json(args.stats_json)
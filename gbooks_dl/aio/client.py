@@ -0,0 +1,232 @@
+"""
+A minimal HTTP/1.1 client built on asyncio streams.
+
+The standard library has no asynchronous HTTP client, and gbooks-dl has no
+third-party dependencies, so this implements just enough of the protocol for
+our needs: GET requests, chunked or length-delimited bodies and redirects.
+Response bodies are read in full before being returned.
+
+As with `Transport`, connections are kept alive and reused, so consecutive
+requests to a host don't each pay for a new connection and TLS handshake.
+"""
+import io
+import ssl
+import time
+import asyncio
+import urllib.error
+import urllib.parse
+import email.parser
+from collections import deque
+from http.client import HTTPMessage, RemoteDisconnected, IncompleteRead
+from typing import Optional
+
+from gbooks_dl.stats import run_stats
+from gbooks_dl.exceptions import GBooksDlHttpException
+from gbooks_dl.ratelimit import AdaptiveRateLimiter, THROTTLED_STATUSES
+from gbooks_dl.transport import (
+    BufferedResponse,
+    REDIRECT_STATUSES,
+    MAX_REDIRECTS,
+    MAX_THROTTLED_ATTEMPTS,
+    split_url,
+    _PoolKey,
+    _STALE_CONNECTION_ERRORS
+)
+
+# Statuses whose responses never have a body
+_NO_BODY_STATUSES = {204, 304}
+
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class AsyncClient:
+    """
+    Sends GET requests on the running event loop.
+
+    `limit` bounds the number of requests in flight at once across every
+    coroutine that shares the client. As with `Transport`, every request also
+    waits for the go-ahead from `rate_limiter`, throttled requests are sent
+    again once it allows, and error statuses raise `urllib.error.HTTPError`.
+
+    Each attempt at a request which hasn't got its whole response within
+    `timeout` seconds fails with a `TimeoutError`.
+
+    Like `ConnectionPool`, up to `limit` idle connections are kept per host,
+    and connections idle for longer than `idle_timeout` seconds are dropped
+    rather than reused. `close()` closes the idle connections.
+    """
+    def __init__(
+            self,
+            limit: int = 8,
+            rate_limiter: Optional[AdaptiveRateLimiter] = None,
+            timeout: Optional[float] = None,
+            idle_timeout: float = 30.0
+    ):
+        self._timeout = timeout
+        self._limit = max(1, limit)
+        self._semaphore = asyncio.Semaphore(self._limit)
+        self._ssl_context = ssl.create_default_context()
+        self._rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+        self._idle_timeout = idle_timeout
+        self._idle: dict[_PoolKey, deque[tuple[_Connection, float]]] = {}
+
+    async def get(self, url: str, headers: Optional[dict] = None) -> BufferedResponse:
+        if headers is None:
+            headers = {}
+        redirects = 0
+        throttled = 0
+        queued = time.perf_counter()
+        async with self._semaphore:
+            run_stats.add_wait(time.perf_counter() - queued)
+            while True:
+                await self._rate_limiter.acquire_async()
+                try:
+                    res = await asyncio.wait_for(self._get(url, headers), self._timeout)
+                except asyncio.TimeoutError:
+                    # Only the same error as TimeoutError from Python 3.11
+                    raise TimeoutError(f'Timed out waiting for a response from {url}') from None
+                self._rate_limiter.on_response(res.status, res.getheader('Retry-After'))
+
+                location = res.getheader('Location')
+                if res.status in REDIRECT_STATUSES and location is not None:
+                    redirects += 1
+                    if redirects > MAX_REDIRECTS:
+                        raise GBooksDlHttpException(f'Too many redirects while requesting {url}')
+                    url = urllib.parse.urljoin(url, location)
+                elif res.status in THROTTLED_STATUSES and throttled < MAX_THROTTLED_ATTEMPTS:
+                    throttled += 1
+                elif res.status >= 400:
+                    raise urllib.error.HTTPError(url, res.status, res.reason, res.headers, io.BytesIO(res.read()))
+                else:
+                    return res
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for (_, writer), _ in idle:
+                writer.close()
+        self._idle.clear()
+
+    def __enter__(self) -> 'AsyncClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    async def _get(self, url: str, headers: dict) -> BufferedResponse:
+        key, target = split_url(url)
+        request = self._build_request(urllib.parse.urlsplit(url).netloc, target, headers)
+
+        conn, reused = await self._acquire(key)
+        try:
+            res, keep_alive = await self._send(conn, url, request)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            # The server dropped the idle connection, so retry on a fresh one.
+            conn = await self._connect(key)
+            res, keep_alive = await self._send(conn, url, request)
+        if keep_alive:
+            self._release(key, conn)
+        else:
+            conn[1].close()
+        return res
+
+    async def _acquire(self, key: _PoolKey) -> tuple[_Connection, bool]:
+        """
+        Returns a connection for `key`, and whether it was reused from the pool.
+        """
+        now = time.monotonic()
+        idle = self._idle.get(key)
+        while idle:
+            (reader, writer), last_used = idle.pop()
+            if now - last_used <= self._idle_timeout and not reader.at_eof() and not writer.is_closing():
+                return (reader, writer), True
+            writer.close()
+        return await self._connect(key), False
+
+    def _release(self, key: _PoolKey, conn: _Connection) -> None:
+        idle = self._idle.setdefault(key, deque())
+        if len(idle) < self._limit:
+            idle.append((conn, time.monotonic()))
+            return
+        conn[1].close()
+
+    async def _connect(self, key: _PoolKey) -> _Connection:
+        scheme, host, port = key
+        return await asyncio.open_connection(host, port, ssl=self._ssl_context if scheme == 'https' else None)
+
+    async def _send(self, conn: _Connection, url: str, request: bytes) -> tuple[BufferedResponse, bool]:
+        """
+        Sends `request` on `conn` and reads its response. The connection is
+        closed if anything goes wrong, including the request being cancelled
+        or timing out, as it may be left partway through a response.
+        """
+        reader, writer = conn
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await self._read_response(url, reader)
+        except BaseException:
+            writer.close()
+            raise
+
+    @staticmethod
+    def _build_request(host: str, target: str, headers: dict) -> bytes:
+        lines = [f'GET {target} HTTP/1.1', f'Host: {host}']
+        lines += [f'{k}: {v}' for k, v in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    @staticmethod
+    async def _read_response(url: str, reader: asyncio.StreamReader) -> tuple[BufferedResponse, bool]:
+        """
+        Returns the response, and whether its connection can be reused.
+        """
+        status_line = (await reader.readline()).decode('latin-1')
+        if not status_line:
+            raise RemoteDisconnected(f'{url} closed the connection without a response')
+        try:
+            version, status, *reason = status_line.split(None, 2)
+            status = int(status)
+        except ValueError as exc:
+            raise GBooksDlHttpException(
+                f'Bad status line from {url}: {status_line!r}'
+            ) from exc
+
+        header_lines = []
+        while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+            header_lines.append(line.decode('latin-1'))
+        headers = email.parser.Parser(_class=HTTPMessage).parsestr(''.join(header_lines))
+
+        connection = headers.get('Connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        try:
+            if status in _NO_BODY_STATUSES or 100 <= status < 200:
+                body = b''
+            elif headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                body = await _read_chunked(reader)
+            elif headers.get('Content-Length') is not None:
+                body = await reader.readexactly(int(headers['Content-Length']))
+            else:
+                # The body runs until the server closes the connection
+                body = await reader.read()
+                keep_alive = False
+        except asyncio.IncompleteReadError as exc:
+            # Raised as on the sync path, where http.client reads the body
+            raise IncompleteRead(exc.partial, exc.expected) from None
+
+        return BufferedResponse(url, status, ''.join(reason).strip(), headers, body), keep_alive
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        size = int(size_line.split(b';')[0].strip(), 16)
+        if size == 0:
+            # Discard any trailers
+            while (await reader.readline()) not in (b'\r\n', b''):
+                ...
+            break
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+    return b''.join(chunks)
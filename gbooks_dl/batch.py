@@ -0,0 +1,205 @@
+"""
+Downloading many books in one process.
+
+Rather than running `gbooks-dl` once per book, a batch shares one pool of
+connections, one session and one limit on concurrent downloads between all
+of its books, and a book that fails doesn't stop the rest of the batch.
+"""
+import os
+from typing import NamedTuple, Optional, Iterable, TextIO
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from gbooks_dl.logging import log_err
+from gbooks_dl.stats import run_stats
+from gbooks_dl.cache import LookupCache
+from gbooks_dl.store import ContentStore
+from gbooks_dl.cookiejar import CookieJar
+from gbooks_dl.transport import new_transport
+from gbooks_dl.retry import RetryPolicy
+from gbooks_dl.ratelimit import AdaptiveRateLimiter
+from gbooks_dl.messages import write_batch_results
+from gbooks_dl.output.resolver import FOLDER_FORMAT
+from gbooks_dl.pipeline import _get_book, _get_output
+
+
+class BatchResult(NamedTuple):
+    url: str
+    error: Optional[BaseException] = None
+
+
+def read_batch_urls(f: TextIO) -> list[str]:
+    """
+    Reads one URL per line, ignoring blank lines and lines starting with '#'.
+    """
+    return [
+        line.strip()
+        for line in f
+        if line.strip() and not line.lstrip().startswith('#')
+    ]
+
+
+def batch_pipeline(
+        urls: Iterable[str],
+        dest: os.PathLike | str,
+        jobs: int = 1,
+        prefetch: bool = False,
+        cache: Optional[LookupCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        store: Optional[ContentStore] = None,
+        output_format: str = FOLDER_FORMAT,
+        cookie_jar: Optional[CookieJar] = None,
+        http2: bool = False,
+        timeout: Optional[float] = None
+) -> list[BatchResult]:
+    """
+    Downloads each book into its own folder in `dest`, named after its ID.
+    A URL listed more than once is only downloaded once.
+
+    Every book is requested in one session, so each book starts with the
+    cookies picked up by the books before it. Books are crawled one after
+    another, and as soon as a book has been crawled, its pages are handed to
+    a pool of `jobs` download workers shared by the whole batch, and the next
+    book is crawled while they download. Unlike `pipeline()`, a book's pages
+    aren't downloaded during its own crawl, which keeps the batch to a single
+    crawl at a time.
+
+    The session starts with the cookies kept in `cookie_jar`, if any, and its
+    cookies are saved back to it once, at the end of the batch. With `http2`,
+    requests are sent over HTTP/2 where possible, and requests time out after
+    `timeout` seconds, as in `pipeline()`.
+    """
+    if jobs < 1:
+        raise ValueError(f'jobs must be at least 1, not {jobs}')
+    results: list[tuple[str, Future | BatchResult]] = []
+    with new_transport(pool_size=jobs, rate_limiter=rate_limiter, http2=http2, timeout=timeout) as transport, \
+            ThreadPoolExecutor(max_workers=jobs) as page_executor, \
+            ThreadPoolExecutor(max_workers=2) as book_executor:
+        session = None
+        for url in _unique(urls):
+            try:
+                book = _get_book(
+                    url,
+                    transport,
+                    prefetch=prefetch,
+                    cache=cache,
+                    session=session,
+                    retry_policy=retry_policy,
+                    cookie_jar=cookie_jar
+                )
+                session = book.session
+                with run_stats.timer('crawl'):
+                    pages = book.get_pages()
+                book_dest, page_writer = _get_output(dest, book, output_format)
+            except Exception as exc:
+                results.append((url, _failed(url, exc)))
+                continue
+
+            downloader = book.downloader(
+                book_dest,
+                book.session,
+                jobs=jobs,
+                executor=page_executor,
+                retry_policy=retry_policy,
+                store=store,
+                page_writer=page_writer,
+                book_id=book.id
+            )
+            results.append((url, book_executor.submit(downloader.download_pages, pages)))
+
+        try:
+            return [_get_result(url, result) for url, result in results]
+        finally:
+            if session is not None:
+                session.save_cookies()
+
+
+async def async_batch_pipeline(
+        urls: Iterable[str],
+        dest: os.PathLike | str,
+        jobs: int = 1,
+        prefetch: bool = False,
+        cache: Optional[LookupCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        store: Optional[ContentStore] = None,
+        output_format: str = FOLDER_FORMAT,
+        cookie_jar: Optional[CookieJar] = None,
+        timeout: Optional[float] = None
+) -> list[BatchResult]:
+    """
+    Asynchronous counterpart of `batch_pipeline()`.
+
+    Every book runs at once on the event loop, sharing one session and a
+    client which allows `jobs` requests in flight in total, and each book's
+    pages are downloaded while it is still being crawled.
+    """
+    import asyncio
+    from gbooks_dl.aio.client import AsyncClient
+    if jobs < 1:
+        raise ValueError(f'jobs must be at least 1, not {jobs}')
+    urls = _unique(urls)
+    session = None
+
+    async def _run(url: str) -> None:
+        nonlocal session
+        book = _get_book(url, prefetch=prefetch, cache=cache, session=session, retry_policy=retry_policy,
+                         cookie_jar=cookie_jar)
+        session = book.session
+
+        book_dest, page_writer = _get_output(dest, book, output_format)
+        downloader = book.downloader(
+            book_dest,
+            book.session,
+            jobs=jobs,
+            retry_policy=retry_policy,
+            store=store,
+            page_writer=page_writer,
+            book_id=book.id
+        )
+        await downloader.download_pages_async(book.iter_pages_async(client), client)
+
+    with AsyncClient(limit=jobs, rate_limiter=rate_limiter, timeout=timeout) as client:
+        errors = await asyncio.gather(*(_run(url) for url in urls), return_exceptions=True)
+    if session is not None:
+        session.save_cookies()
+    return [
+        _failed(url, error) if isinstance(error, BaseException) else BatchResult(url)
+        for url, error in zip(urls, errors)
+    ]
+
+
+def run_batch(urls: Iterable[str], dest: os.PathLike | str, use_async: bool = False, **kw) -> bool:
+    """
+    Runs a batch and reports the outcome of each book. Returns True if every book succeeded.
+    """
+    if use_async:
+        import asyncio
+        results = asyncio.run(async_batch_pipeline(urls, dest, **kw))
+    else:
+        results = batch_pipeline(urls, dest, **kw)
+    write_batch_results(results)
+    return all(r.error is None for r in results)
+
+
+def _unique(urls: Iterable[str]) -> list[str]:
+    """
+    `urls` in order, without repeats, which would otherwise be downloaded
+    into the same folder at the same time.
+    """
+    return list(dict.fromkeys(urls))
+
+
+def _get_result(url: str, result: Future | BatchResult) -> BatchResult:
+    if isinstance(result, BatchResult):
+        return result
+    try:
+        result.result()
+    except Exception as exc:
+        return _failed(url, exc)
+    return BatchResult(url)
+
+
+def _failed(url: str, exc: BaseException) -> BatchResult:
+    log_err(f"Failed to download {url}: {exc}\n")
+    return BatchResult(url, exc)
@@ -1,8 +1,5 @@
-from gbooks_dl.books.base.book import Book
-from gbooks_dl.books.providers.google import GoogleBook
+from gbooks_dl.books.providers.resolver import get_provider_book_class
 
 
-def get_book_class(second_level_domain: str) -> Book | None:
-    return {
-        'google': GoogleBook
-    }.get(second_level_domain)
+def get_book_class(second_level_domain: str) -> type | None:
+    return get_provider_book_class(second_level_domain)
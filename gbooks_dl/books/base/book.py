@@ -1,26 +1,95 @@
-from typing import Type, Optional
+from typing import TYPE_CHECKING, Type, Optional, Generator, AsyncIterator
 from abc import ABC, abstractmethod
 
+from gbooks_dl.cache import LookupCache
+from gbooks_dl.retry import RetryPolicy
+from gbooks_dl.session import Session
+from gbooks_dl.cookiejar import CookieJar
+from gbooks_dl.transport import BaseTransport
 from gbooks_dl.books.base.page import Page
 from gbooks_dl.books.base.downloader import Downloader
 
+if TYPE_CHECKING:
+    from gbooks_dl.aio.client import AsyncClient
+
 URL = str
 
 
 class Book(ABC):
     downloader: Type[Downloader] = Downloader
+    session_class: Type[Session] = Session
 
     url: str
     pages: list[Page]
 
-    def __init__(self, url: str):
+    def __init__(
+            self,
+            url: str,
+            transport: Optional[BaseTransport] = None,
+            prefetch: bool = False,
+            cache: Optional[LookupCache] = None,
+            session: Optional[Session] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            cookie_jar: Optional[CookieJar] = None
+    ):
+        """
+        `prefetch` allows providers whose lookups can be predicted to request
+        them speculatively, ahead of when they are needed.
+
+        If a `cache` is given, lookup responses are stored in and served from it.
+
+        `session` is the session to make requests in, e.g. one shared with
+        other books from the same provider. Unless one is given, or it is
+        another provider's, the book starts a session of its own with `transport`,
+        seeded with the cookies kept in `cookie_jar`, if any. Its downloader is
+        to be given the same session. A `transport` other than the one of the
+        session given is rejected, as it would never be used.
+
+        Lookups which fail with a temporary error are retried according to `retry_policy`.
+        """
         self.url = url
+        if isinstance(session, self.session_class):
+            if transport is not None and transport is not session.transport:
+                raise ValueError('A book given a session must use its transport')
+            self.session = session
+        else:
+            self.session = self.session_class(transport, cookie_jar)
+        self._prefetch = prefetch
+        self._cache = cache
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+
+    @property
+    @abstractmethod
+    def id(self) -> str:
+        """
+        An identifier for the book which is unique within its provider.
+        """
+        ...
 
     @abstractmethod
     def get_pages(self) -> list[Page]:
         ...
 
-    @property
     @abstractmethod
-    def cookie(self) -> Optional[tuple[str, str]]:
+    async def get_pages_async(self, client: 'AsyncClient') -> list[Page]:
         ...
+
+    def iter_pages(self) -> Generator[Page, None, list[Page]]:
+        """
+        Yields each page as soon as it is found, so pages can be downloaded
+        while the rest are still being looked for, and returns every page in
+        order at the end.
+
+        Providers which only find out about their pages all at once needn't
+        override this.
+        """
+        pages = self.get_pages()
+        yield from pages
+        return pages
+
+    async def iter_pages_async(self, client: 'AsyncClient') -> AsyncIterator[Page]:
+        """
+        Asynchronous counterpart of `iter_pages()`.
+        """
+        for page in await self.get_pages_async(client):
+            yield page
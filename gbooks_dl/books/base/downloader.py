@@ -1,53 +1,104 @@
 import os
-import urllib.request
 from pathlib import Path
-from typing import TypeVar, final, Optional
-from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, Type, final, Optional, Iterable, AsyncIterable, AsyncIterator
+from abc import ABC
 from http.client import HTTPResponse
+from concurrent.futures import Executor, ThreadPoolExecutor, Future
 
 from gbooks_dl.logging import log_err
+from gbooks_dl.stats import run_stats
+from gbooks_dl.retry import RetryPolicy
+from gbooks_dl.session import Session
+from gbooks_dl.exceptions import DownloadIncompleteException
+from gbooks_dl.transport import Transport, PooledResponse, BufferedResponse
 from gbooks_dl.books.base.page import Page
+from gbooks_dl.books.base.headers import HeadersKind
+from gbooks_dl.store import ContentStore, link_file
+from gbooks_dl.output.writer import PageWriter
+from gbooks_dl.books.base.manifest import Manifest
+from gbooks_dl.books.base.placeholder import PlaceholderRegistry, PREFIX_SIZE
 from gbooks_dl.messages import (
     write_max_dl_pages,
-    write_current_dl_page
+    write_current_dl_page,
+    write_skipped_dl_page,
+    write_deferred_dl_page,
+    write_failed_dl_page,
+    write_duplicate_dl_pages
 )
 from gbooks_dl.utils import (
+    HashingWriter,
     mimetype_map,
     get_response_encoding,
     get_response_mimetype,
-    decompress_response_data,
+    stream_response_to_file,
 )
 
-DownloadHeaders = TypeVar('DownloadHeaders')
+if TYPE_CHECKING:
+    # Only for annotations, as asyncio and the async client are only imported by async runs
+    import asyncio
+    from gbooks_dl.aio.client import AsyncClient
+
+# Rejected bodies up to this size are read to the end rather than abandoning their connection.
+DRAIN_LIMIT = 64 * 1024
 
 
 class Downloader(ABC):
-    def __init__(self, dest: os.PathLike, cookie: Optional[tuple[str, str]] = None):
-        self._dest = dest
-        self._headers = None
-        self._initial_cookie = cookie
+    placeholders: Optional[PlaceholderRegistry] = None
+    session_class: Type[Session] = Session
+    # The kind of headers pages are requested with
+    headers_kind: Optional[HeadersKind] = None
 
-    @abstractmethod
-    def set_headers(self, *a, **kw) -> DownloadHeaders:
+    def __init__(
+            self,
+            dest: os.PathLike,
+            session: Optional[Session] = None,
+            jobs: int = 1,
+            executor: Optional[Executor] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            store: Optional[ContentStore] = None,
+            page_writer: Optional[PageWriter] = None,
+            book_id: Optional[str] = None
+    ):
         """
-        Different providers will require different headers.
+        Pages are requested in `session`, which should be the session of the
+        book they belong to, so the cookies picked up by its lookups go with
+        them. Unless one is given, a new session is started.
 
-        This method should be implemented in concrete classes, and it should generate
-        appropriate headers for the given provider.
-        """
-        ...
+        Pages are downloaded by `jobs` workers, unless an `executor` is given,
+        in which case they are downloaded by its workers instead. This lets
+        several downloaders share a single limit on concurrent downloads.
 
-    # @abstractmethod
-    # def set_initial_headers(self, *a, **kw):
-    #     ...
+        If a `store` is given, each image is kept in it and the files in `dest`
+        are links to it.
 
-    def set_initial_cookie(self) -> None:
-        if self._headers is not None and self._initial_cookie is not None:
-            self._headers.update({self._initial_cookie[0]: self._initial_cookie[1]})
+        If a `page_writer` is given, pages are written into it, in page order,
+        once they are downloaded and their order is known, and `dest` only
+        holds each page's file until then.
 
-    @abstractmethod
-    def set_cookie(self, res: HTTPResponse) -> None:
-        ...
+        `book_id` is the ID of the book the pages belong to, which the manifest
+        in `dest` is kept under, so a manifest left by another book is ignored.
+        """
+        if jobs < 1:
+            raise ValueError(f'jobs must be at least 1, not {jobs}')
+        self._dest = dest
+        self._book_id = book_id
+        self._store = store
+        self._page_writer = page_writer
+        self._duplicates: dict[str, list[str]] = {}
+        self._session = session if session is not None else self.session_class(Transport(pool_size=jobs))
+        self._executor = executor
+        self._retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self._jobs = jobs
+        self._manifest: Optional[Manifest] = None
+        # Every page produced so far, then sorted once they all have been
+        self._pages: list[Page] = []
+        self._first_with_url: dict[str, Page] = {}
+        self._unique_count = 0
+        self._max_pages: Optional[int] = None
+        self._finished: set[str] = set()
+        # Enough pages queued up to keep every worker busy while more are found
+        self._queue_size = 4 * self._jobs
 
     @staticmethod
     def _response_is_ok(res: HTTPResponse) -> bool:
@@ -61,55 +112,466 @@ class Downloader(ABC):
         return True if res.status == 200 else False
 
     @staticmethod
-    def _data_is_ok(data: bytes) -> bool:
+    def _data_is_ok(fp: Path) -> bool:
         """
         Method for validating data returned in response.
 
         Some providers might return unusable/dummy data despite the response
-        validation check passing.
+        validation check passing. Known placeholder images are best listed in
+        `placeholders` instead, which lets them be rejected early.
 
         This method serves to analyse the data returned to check if it is OK.
+        It is given the path of the (temporary) file the data was streamed to.
         """
         return True
 
     @final
-    def download_pages(self, pages: list[Page]) -> None:
-        max_pages = len(pages)
-        write_max_dl_pages(max_pages)
+    def download_pages(self, pages: Iterable[Page]) -> None:
+        """
+        Download each page to the destination folder using up to `jobs` workers.
+
+        `pages` may still be being found, e.g. by a book's `iter_pages()`: each
+        page is downloaded as soon as it is produced, and producing more pages
+        is only held up while `4 * jobs` of them are waiting on their downloads.
+
+        Progress is reported in the order pages were produced regardless of
+        which worker finishes first.
+
+        Pages recorded as complete in the destination's manifest by an earlier
+        run are skipped, provided their files are still intact. Once done, the
+        checksums of the downloaded pages are written to a SHA256SUMS file.
+        """
+        self._start_output()
+
+        with run_stats.timer('download'):
+            try:
+                if self._executor is not None:
+                    self._download_with(self._executor, pages)
+                else:
+                    with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                        self._download_with(executor, pages)
+            except BaseException as exc:
+                self._finish_output(exc)
+                raise
+            self._finish_output()
+
+    def _download_with(self, executor: Executor, pages: Iterable[Page]) -> None:
+        """
+        Pages which fail with a retryable error are put aside rather than
+        retried on the spot, so they don't hold up the pages behind them.
+        Once every page has had its first attempt, the deferred pages are
+        retried according to the retry policy.
+        """
+        in_flight: deque[tuple[int, Page, Future]] = deque()
+        deferred: list[tuple[int, Page]] = []
+        failed: list[Page] = []
+        retry_futures = []
+
+        def settle_first() -> None:
+            idx, page, future = in_flight.popleft()
+            try:
+                fetched = future.result()
+            except Exception as exc:
+                self._first_attempt_failed(idx, page, exc, deferred, failed)
+                return
+            self._write_progress(idx, fetched)
+            self._page_finished(page)
+
+        try:
+            for page in run_stats.timed_iter('crawl', pages):
+                if not self._add_page(page):
+                    continue
+                in_flight.append((self._unique_count, page, executor.submit(self._download_page, page)))
+                if len(in_flight) >= self._queue_size:
+                    settle_first()
+            self._end_production()
+            while in_flight:
+                settle_first()
+
+            retry_futures = [
+                executor.submit(self._retry_policy.call, self._download_page, page, attempts_made=1)
+                for _, page in deferred
+            ]
+            for (idx, page), future in zip(deferred, retry_futures):
+                try:
+                    fetched = future.result()
+                except Exception as exc:
+                    self._fail_page(idx, exc)
+                    failed.append(page)
+                    self._page_finished(page)
+                    continue
+                self._write_progress(idx, fetched)
+                self._page_finished(page)
+        finally:
+            for *_, future in in_flight:
+                future.cancel()
+            for future in retry_futures:
+                future.cancel()
+        self._check_failed_pages(failed)
+
+    @final
+    async def download_pages_async(
+            self,
+            pages: Iterable[Page] | AsyncIterable[Page],
+            client: 'AsyncClient'
+    ) -> None:
+        """
+        Asynchronous counterpart of `download_pages()`, which also accepts
+        pages from an asynchronous iterable, e.g. a book's `iter_pages_async()`.
+
+        Pages are requested through `client`, which bounds how many requests
+        are actually in flight.
+        """
+        self._start_output()
+
+        with run_stats.timer('download'):
+            try:
+                await self._download_all_async(pages, client)
+            except BaseException as exc:
+                self._finish_output(exc)
+                raise
+            self._finish_output()
+
+    async def _download_all_async(
+            self,
+            pages: Iterable[Page] | AsyncIterable[Page],
+            client: 'AsyncClient'
+    ) -> None:
+        """
+        The crawl producing `pages` runs as a task of its own, which queues up
+        to `4 * jobs` pages, so it carries on while the pages before are being
+        downloaded. Only `jobs` pages are requested at once, leaving the crawl's
+        lookups a fair share of the client rather than queueing behind pages.
+        """
+        import asyncio
+        produced: asyncio.Queue[Optional[Page]] = asyncio.Queue(maxsize=self._queue_size)
+        producer = asyncio.ensure_future(_produce_pages(pages, produced))
+        in_flight: deque[tuple[int, Page, asyncio.Task]] = deque()
+        deferred: list[tuple[int, Page]] = []
+        failed: list[Page] = []
+        retry_tasks = []
+
+        async def settle_first() -> None:
+            idx, page, task = in_flight.popleft()
+            try:
+                fetched = await task
+            except Exception as exc:
+                self._first_attempt_failed(idx, page, exc, deferred, failed)
+                return
+            self._write_progress(idx, fetched)
+            await asyncio.to_thread(self._page_finished, page)
 
-        headers = self.set_headers()
-        self.set_initial_cookie()
+        try:
+            while (page := await produced.get()) is not None:
+                if not self._add_page(page):
+                    continue
+                task = asyncio.ensure_future(self._download_page_async(page, client))
+                in_flight.append((self._unique_count, page, task))
+                if len(in_flight) >= self._jobs:
+                    await settle_first()
+            # Raises the crawl's error, if it failed
+            await producer
+            self._end_production()
+            while in_flight:
+                await settle_first()
 
-        for idx, page in enumerate(pages):
-            write_current_dl_page(idx + 1, max_pages)
-            filename = f"{idx + 1}_{str(page.number)}"
+            retry_tasks = [
+                asyncio.ensure_future(self._retry_policy.call_async(
+                    self._download_page_async, page, client, attempts_made=1
+                ))
+                for _, page in deferred
+            ]
+            for (idx, page), task in zip(deferred, retry_tasks):
+                try:
+                    fetched = await task
+                except Exception as exc:
+                    self._fail_page(idx, exc)
+                    failed.append(page)
+                    await asyncio.to_thread(self._page_finished, page)
+                    continue
+                self._write_progress(idx, fetched)
+                await asyncio.to_thread(self._page_finished, page)
+        finally:
+            producer.cancel()
+            for *_, task in in_flight:
+                task.cancel()
+            for task in retry_tasks:
+                task.cancel()
+        self._check_failed_pages(failed)
 
-            req = urllib.request.Request(page.url, headers=headers)
-            res = urllib.request.urlopen(req)
-            self.set_cookie(res)
+    def _first_attempt_failed(
+            self,
+            idx: int,
+            page: Page,
+            exc: Exception,
+            deferred: list[tuple[int, Page]],
+            failed: list[Page]
+    ) -> None:
+        if self._defer_page(idx, exc):
+            deferred.append((idx, page))
+        else:
+            failed.append(page)
+            self._page_finished(page)
 
-            if not self._response_is_ok(res):
-                print(f'Response from URL {page.url} failed validation check.')
+    def _start_output(self) -> None:
+        self._manifest = Manifest(self._dest, self._book_id)
+        self._pages = []
+        self._first_with_url = {}
+        self._unique_count = 0
+        self._max_pages = None
+        self._duplicates = {}
+        self._finished = set()
+        if self._page_writer is not None:
+            self._page_writer.open()
+
+    def _add_page(self, page: Page) -> bool:
+        """
+        Takes note of a page as it is produced. Returns True if its source is
+        new, or False if it shares its source with an earlier page, in which
+        case it is given that page's image instead of being downloaded.
+        """
+        self._pages.append(page)
+        original = self._first_with_url.setdefault(page.url, page)
+        if original is page:
+            self._unique_count += 1
+            return True
+        key, original_key = str(page.number), str(original.number)
+        self._duplicates.setdefault(original_key, []).append(key)
+        if original_key in self._finished:
+            self._add_to_output([key], original_key)
+        return False
+
+    def _end_production(self) -> None:
+        """
+        Called once every page has been produced, which fixes their order.
+        """
+        run_stats.count('pages_discovered', len(self._pages))
+        self._pages.sort(key=lambda page: page.number)
+        self._max_pages = self._unique_count
+        write_max_dl_pages(self._unique_count)
+        write_duplicate_dl_pages(len(self._pages) - self._unique_count)
+        if self._page_writer is not None:
+            with run_stats.timer('disk'):
+                self._page_writer.set_order([str(page.number) for page in self._pages])
+
+    def _page_finished(self, page: Page) -> None:
+        """
+        Called once a page has been downloaded or given up on, in the order
+        pages were produced.
+        """
+        key = str(page.number)
+        self._finished.add(key)
+        self._add_to_output([key] + self._duplicates.get(key, []), key)
+
+    def _add_to_output(self, page_keys: list[str], original_key: str) -> None:
+        """
+        Hands the pages with `page_keys`, whose image is that of the page with
+        `original_key`, to the page writer, if any.
+        """
+        if self._page_writer is None:
+            return
+        entry = self._manifest.get(original_key)
+        fp = Path(self._dest, entry['file']) if entry is not None else None
+        with run_stats.timer('disk'):
+            self._page_writer.add_page(page_keys, fp)
+
+    def _finish_output(self, exc: Optional[BaseException] = None) -> None:
+        """
+        A download with pages missing still has its output finished, with the
+        pages it did get, but one interrupted by any other error doesn't. Either
+        way, the page writer keeps the pages it has, so the download can be resumed.
+        """
+        if self._page_writer is None:
+            self._link_duplicates()
+            self._write_checksums()
+        elif exc is None or isinstance(exc, DownloadIncompleteException):
+            self._write_checksums(self._page_writer.checksums_path)
+            with run_stats.timer('disk'):
+                self._page_writer.close(complete=exc is None)
+        else:
+            self._page_writer.abort()
+
+    def _link_duplicates(self) -> None:
+        """
+        Gives each page whose source was shared with an earlier page a link
+        to the earlier page's file, if that page was downloaded.
+        """
+        for original_key, keys in self._duplicates.items():
+            entry = self._manifest.get(original_key)
+            if entry is None:
                 continue
+            src_fp = Path(self._dest, entry['file'])
+            for key in keys:
+                if self._manifest.is_complete(key):
+                    continue
+                fp = Path(self._dest, key + src_fp.suffix)
+                with run_stats.timer('disk'):
+                    link_file(src_fp, fp)
+                self._manifest.record(key, fp, entry['sha256'])
 
-            stream = decompress_response_data(
-                res.read(),
-                get_response_encoding(res)
-            )
+    def _write_checksums(self, fp: Optional[Path] = None) -> None:
+        with run_stats.timer('disk'):
+            self._manifest.write_checksums([str(page.number) for page in self._pages], fp)
 
-            extension = mimetype_map().get(
-                get_response_mimetype(res)
+    def _write_progress(self, pg: int, fetched: bool) -> None:
+        if fetched:
+            write_current_dl_page(pg, self._max_pages)
+        else:
+            write_skipped_dl_page(pg, self._max_pages)
+
+    def _defer_page(self, pg: int, exc: Exception) -> bool:
+        """
+        Handles a page's first failure. Returns True if the page should be
+        retried later, or False if it has failed for good. Errors which aren't
+        worth retrying are raised.
+        """
+        if self._retry_policy.max_attempts > 1 and self._retry_policy.is_retryable(exc):
+            write_deferred_dl_page(pg, self._max_pages, exc)
+            return True
+        self._fail_page(pg, exc)
+        return False
+
+    def _fail_page(self, pg: int, exc: Exception) -> None:
+        if not self._retry_policy.is_retryable(exc):
+            raise exc
+        write_failed_dl_page(pg, self._max_pages, exc)
+
+    @staticmethod
+    def _check_failed_pages(failed: list[Page]) -> None:
+        if failed:
+            failed = sorted(failed, key=lambda page: page.number)
+            raise DownloadIncompleteException(
+                f"{len(failed)} page(s) could not be downloaded: "
+                f"{', '.join(str(page.number) for page in failed)}"
             )
-            filename += extension
-            fp = str(Path(self._dest, filename))
 
-            img_data = stream.read()
-            if not self._data_is_ok(img_data):
-                self._write_invalid_img(page)
-                continue
-            with open(fp, 'wb') as out:
-                out.write(img_data)
+    def _download_page(self, page: Page) -> bool:
+        """
+        Returns False if the page was skipped because it is already downloaded.
+        """
+        if self._manifest.is_complete(str(page.number)):
+            run_stats.count('pages_skipped')
+            return False
+        with run_stats.request('image'):
+            res = self._session.transport.request(page.url, self._session.headers(self.headers_kind))
+        with res:
+            self._save_page(page, res)
+        return True
+
+    async def _download_page_async(self, page: Page, client: 'AsyncClient') -> bool:
+        """
+        Checking and saving the page's file are done on a worker thread, so
+        they don't hold up every other download on the event loop.
+        """
+        import asyncio
+        if await asyncio.to_thread(self._manifest.is_complete, str(page.number)):
+            run_stats.count('pages_skipped')
+            return False
+        with run_stats.request('image'):
+            res = await client.get(page.url, self._session.headers(self.headers_kind))
+        await asyncio.to_thread(self._save_page, page, res)
+        return True
+
+    def _save_page(self, page: Page, res: PooledResponse | BufferedResponse) -> None:
+        """
+        Stream the image in `res` to a temporary file next to its destination,
+        and only rename it into place once it has been validated.
+
+        Files are named after the page number alone, so a page keeps the same
+        file name from one run to the next.
+        """
+        self._session.update_cookies(res)
+        filename = str(page.number)
+
+        if not self._response_is_ok(res):
+            print(f'Response from URL {page.url} failed validation check.')
+            return
+
+        extension = mimetype_map().get(
+            get_response_mimetype(res)
+        )
+        filename += extension
+        fp = Path(self._dest, filename)
+        if self._store is not None:
+            tmp_fp = self._store.temp_path()
+        else:
+            tmp_fp = fp.with_name(f'{filename}.part')
+
+        # Rule out, or reject, placeholders as early as possible. The first bytes
+        # of the image can only be read ahead of the rest if it isn't compressed.
+        check = self.placeholders.check(res) if self.placeholders is not None else None
+        head = b''
+        if check is not None and not check.cleared and get_response_encoding(res) is None:
+            head = res.read(PREFIX_SIZE)
+            if check.check_prefix(head):
+                run_stats.add_bytes(len(head), len(head))
+                run_stats.count('placeholders_rejected_early')
+                self._reject_placeholder(page, res)
+                return
+
+        # The image is hashed as it is written: md5 to match it against the
+        # remaining placeholders, if any, and sha256 for the manifest.
+        may_be_placeholder = check is not None and not check.cleared
+        try:
+            with open(tmp_fp, 'wb') as out:
+                writer = HashingWriter(
+                    run_stats.timed_writer(out),
+                    ('sha256', 'md5') if may_be_placeholder else ('sha256',)
+                )
+                writer.write(head)
+                read, written = stream_response_to_file(res, writer)
+                run_stats.add_bytes(len(head) + read, len(head) + written)
+            if (
+                may_be_placeholder and check.check_data(len(head) + written, writer.hexdigest('md5'))
+            ) or not self._data_is_ok(tmp_fp):
+                self._reject_placeholder(page, res)
+                return
+            with run_stats.timer('disk'):
+                if self._store is not None:
+                    obj = self._store.add(tmp_fp, writer.hexdigest('sha256'), extension)
+                    link_file(obj, fp)
+                else:
+                    os.replace(tmp_fp, fp)
+        finally:
+            tmp_fp.unlink(missing_ok=True)
+        self._manifest.record(str(page.number), fp, writer.hexdigest('sha256'))
+        run_stats.count('pages_downloaded')
+
+    def _reject_placeholder(self, page: Page, res: PooledResponse | BufferedResponse) -> None:
+        """
+        The rest of a small body is read, so its connection can be reused,
+        while the connection of a large one is abandoned.
+        """
+        run_stats.count('placeholders_rejected')
+        content_length = res.getheader('Content-Length')
+        if content_length is not None and content_length.isdigit() and int(content_length) <= DRAIN_LIMIT:
+            res.read()
+        res.close()
+        self._write_invalid_img(page)
 
     @staticmethod
     def _write_invalid_img(page, *a, **kw):
         log_err(f'Image data from URL {page.url} failed validation check.')
+
+
+async def _produce_pages(pages: Iterable[Page] | AsyncIterable[Page], produced: 'asyncio.Queue') -> None:
+    """
+    Puts each page into `produced` as it is found, followed by None once
+    there are no more, or once finding them has failed.
+    """
+    try:
+        async for page in run_stats.timed_aiter('crawl', _aiter(pages)):
+            await produced.put(page)
+    except Exception:
+        await produced.put(None)
+        raise
+    await produced.put(None)
+
+
+async def _aiter(pages: Iterable[Page] | AsyncIterable[Page]) -> AsyncIterator[Page]:
+    if isinstance(pages, AsyncIterable):
+        async for page in pages:
+            yield page
+    else:
+        for page in pages:
+            yield page
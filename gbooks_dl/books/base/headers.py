@@ -15,7 +15,10 @@ class RequestHeadersFactory(ABC):
     """
     @staticmethod
     @abstractmethod
-    def get_headers(*, kind: Optional[HeadersKind] = None) -> Headers:
+    def get_headers(*, kind: Optional[HeadersKind] = None, user_agent: Optional[str] = None) -> Headers:
+        """
+        A random user agent is picked unless `user_agent` is given.
+        """
         ...
 
     @staticmethod
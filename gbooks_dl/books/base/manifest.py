@@ -0,0 +1,115 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from gbooks_dl.utils import file_digest
+
+
+class Manifest:
+    """
+    Record of the pages of a book which have been completely downloaded.
+
+    It is kept as a JSON lines file in the output folder, and each completed
+    page appends one entry, keyed by the string form of its page number, with
+    the name, size and sha256 checksum of the file it was saved to. Appending
+    keeps each update cheap, and a line torn by a crash is simply ignored
+    when the manifest is next loaded.
+
+    The first line names the book the manifest belongs to. Page numbers are
+    only unique within a book, so the manifest of any other book found in the
+    folder is treated as empty, and replaced.
+    """
+    FILENAME = 'manifest.jsonl'
+    CHECKSUMS_FILENAME = 'SHA256SUMS'
+
+    def __init__(self, dest: os.PathLike | str, book_id: Optional[str] = None):
+        self._dest = Path(dest)
+        self._fp = Path(dest, self.FILENAME)
+        self._book_id = book_id
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if not self._load():
+            self._start()
+
+    def _load(self) -> bool:
+        """
+        Returns False if there is no manifest for this book to load.
+        """
+        try:
+            with open(self._fp, encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, json.JSONDecodeError):
+            return False
+        if not isinstance(header, dict) or 'book' not in header or header['book'] != self._book_id:
+            return False
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._entries[entry['page']] = entry
+        return True
+
+    def _start(self) -> None:
+        """
+        Replaces whatever manifest is in the folder with an empty one for this book.
+        """
+        tmp_fp = self._fp.with_name(f'{self._fp.name}.part')
+        with open(tmp_fp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'book': self._book_id}) + '\n')
+        os.replace(tmp_fp, self._fp)
+
+    def get(self, page_key: str) -> Optional[dict]:
+        return self._entries.get(page_key)
+
+    def is_complete(self, page_key: str) -> bool:
+        """
+        Whether the page has been downloaded, and its file is still intact.
+        """
+        entry = self._entries.get(page_key)
+        if entry is None:
+            return False
+        fp = Path(self._dest, entry['file'])
+        try:
+            size = fp.stat().st_size
+        except FileNotFoundError:
+            return False
+        return size == entry['size'] and file_digest(fp) == entry['sha256']
+
+    def record(self, page_key: str, fp: Path, sha256: Optional[str] = None) -> None:
+        """
+        Pass the `sha256` of the file if it is already known, to save hashing it again.
+        """
+        entry = {
+            'page': page_key,
+            'file': fp.name,
+            'size': fp.stat().st_size,
+            'sha256': sha256 if sha256 is not None else file_digest(fp)
+        }
+        with self._lock:
+            self._entries[page_key] = entry
+            with open(self._fp, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+
+    def write_checksums(self, page_keys: list[str], fp: Optional[Path] = None) -> None:
+        """
+        Writes the checksums of the given pages' files, in the given order, to
+        a file in the format of `sha256sum`, so the output can be verified with
+        `sha256sum -c SHA256SUMS`. Pages which aren't in the manifest are left out.
+
+        The file is written to `fp`, or to SHA256SUMS in the output folder.
+        """
+        with self._lock:
+            entries = [self._entries[k] for k in page_keys if k in self._entries]
+        if fp is None:
+            fp = Path(self._dest, self.CHECKSUMS_FILENAME)
+        tmp_fp = fp.with_name(f'{fp.name}.part')
+        with open(tmp_fp, 'w', encoding='utf-8') as f:
+            f.writelines(f"{entry['sha256']}  {entry['file']}\n" for entry in entries)
+        os.replace(tmp_fp, fp)
@@ -0,0 +1,102 @@
+"""
+Recognising the placeholder images some providers serve in place of a page
+which isn't part of the preview, e.g. a 'page not available' image.
+
+Each known placeholder is described by a signature. As much of it as is
+known is checked at each stage of a download, so most pages are cleared
+before their whole body has been read. Placeholders are only rejected that
+early if their signature is conclusive; otherwise they are recognised by
+their hash once the whole image has been read.
+"""
+import hashlib
+from typing import NamedTuple, Optional, Iterable
+
+from gbooks_dl.utils import get_response_encoding, get_response_mimetype
+
+# The number of bytes at the start of an image which are compared against
+# the prefixes of known placeholders.
+PREFIX_SIZE = 64
+
+
+class PlaceholderSignature(NamedTuple):
+    """
+    `md5` is the hash of the whole (decoded) image. The other fields are
+    optional, and a signature which has all of them is conclusive: a response
+    whose Content-Type, Content-Length and first bytes match it is rejected
+    without reading the rest of its body.
+    """
+    md5: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    prefix: Optional[bytes] = None
+
+    @classmethod
+    def from_data(cls, data: bytes, content_type: Optional[str] = None) -> 'PlaceholderSignature':
+        return cls(hashlib.md5(data).hexdigest(), content_type, len(data), data[:PREFIX_SIZE])
+
+    @property
+    def is_conclusive(self) -> bool:
+        return None not in (self.content_type, self.size, self.prefix)
+
+    def matches_headers(self, content_type: Optional[str], size: Optional[int]) -> bool:
+        if self.content_type is not None and content_type is not None and self.content_type != content_type:
+            return False
+        if self.size is not None and size is not None and self.size != size:
+            return False
+        return True
+
+    def matches_prefix(self, prefix: bytes) -> bool:
+        return self.prefix is None or self.prefix == prefix[:len(self.prefix)]
+
+
+class PlaceholderCheck:
+    """
+    Narrows down the placeholders a response could be as its download progresses.
+    """
+    def __init__(self, signatures: Iterable[PlaceholderSignature], res):
+        content_type = get_response_mimetype(res)
+        if content_type is not None:
+            content_type = content_type.split(';')[0].strip()
+
+        # Content-Length only gives the size of the image if the body isn't compressed
+        self.size = None
+        content_length = res.getheader('Content-Length')
+        if get_response_encoding(res) is None and content_length is not None and content_length.isdigit():
+            self.size = int(content_length)
+
+        self.candidates = [s for s in signatures if s.matches_headers(content_type, self.size)]
+
+    @property
+    def cleared(self) -> bool:
+        """
+        True once the response is known not to be a placeholder.
+        """
+        return not self.candidates
+
+    def check_prefix(self, prefix: bytes) -> bool:
+        """
+        Returns True if the response is conclusively a placeholder, given the
+        first `PREFIX_SIZE` bytes of its image.
+        """
+        self.candidates = [s for s in self.candidates if s.matches_prefix(prefix)]
+        return self.size is not None and any(s.is_conclusive for s in self.candidates)
+
+    def check_data(self, size: int, md5: str) -> bool:
+        """
+        Returns True if the whole image, of `size` bytes with the hash `md5`, is a placeholder.
+        """
+        return any(s.md5 == md5 and s.size in (None, size) for s in self.candidates)
+
+
+class PlaceholderRegistry:
+    """
+    The known placeholders of a provider.
+    """
+    def __init__(self, signatures: Iterable[PlaceholderSignature] = ()):
+        self._signatures = list(signatures)
+
+    def register(self, signature: PlaceholderSignature) -> None:
+        self._signatures.append(signature)
+
+    def check(self, res) -> PlaceholderCheck:
+        return PlaceholderCheck(self._signatures, res)
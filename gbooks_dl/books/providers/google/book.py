@@ -1,27 +1,35 @@
+import io
+import os
 import re
 import json
-import http.client
+import urllib.error
 import urllib.parse
-import urllib.request
-from typing import NamedTuple, Optional
-
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import TYPE_CHECKING, NamedTuple, Optional, Generator, Callable, AsyncIterator
+
+from gbooks_dl.cache import LookupCache
+from gbooks_dl.retry import RetryPolicy
+from gbooks_dl.stats import run_stats
+from gbooks_dl.session import Session
+from gbooks_dl.cookiejar import CookieJar
+from gbooks_dl.transport import BaseTransport, BufferedResponse
 from gbooks_dl.books.base.headers import Headers
 from gbooks_dl.messages import write_max_page, write_current_page
 from gbooks_dl.utils import get_response_encoding, decompress_response_data
 from gbooks_dl.books.base.book import Book, URL
 from gbooks_dl.books.base.page import Page
 from gbooks_dl.books.providers.google.downloader import GoogleDownloader
-from gbooks_dl.books.providers.google.cookie import GoogleCookieMixin
-from gbooks_dl.books.providers.google.headers import (
-    GoogleHeaderKinds,
-    GoogleRequestHeadersFactory
-)
+from gbooks_dl.books.providers.google.session import GoogleSession
+from gbooks_dl.books.providers.google.headers import GoogleHeaderKinds
 from gbooks_dl.books.providers.google.exceptions import (
     CannotParseIdException,
     NoPagesInResponseException,
     InvalidPageIdStringException
 )
 
+if TYPE_CHECKING:
+    from gbooks_dl.aio.client import AsyncClient
+
 
 _GPAGEID_KINDS = {
     'PP': 1,
@@ -30,6 +38,9 @@ _GPAGEID_KINDS = {
     'PT': 4
 }
 _GPAGEID_KINDS_REV = {v: k for k, v in _GPAGEID_KINDS.items()}
+BASE_URL_ENV_VAR = 'GBOOKS_DL_GOOGLE_BASE_URL'
+
+_PAGEID_PATTERN = re.compile(r'(?P<kind>P[PRAT])(?P<num>\d+)')
 
 
 class _PageId(NamedTuple):
@@ -51,7 +62,7 @@ class _PageId(NamedTuple):
 
     @classmethod
     def from_id_str(cls, s: str):
-        match = re.match(r'(?P<kind>P[PRAT])(?P<num>\d+)', s)
+        match = _PAGEID_PATTERN.match(s)
         if match is None:
             raise InvalidPageIdStringException(
                 f'Could not evaluate a _GPageId object from page ID string {s}'
@@ -79,13 +90,160 @@ class _PageId(NamedTuple):
         return f'{self.kind_str}{self.num}'
 
 
-class GoogleBook(Book, GoogleCookieMixin):
-    downloader = GoogleDownloader
+class _LookupDigest(NamedTuple):
+    """
+    Everything the crawl needs from a lookup response, gathered in a single
+    pass over its pages so each page ID is only parsed once.
+
+    `pages` holds the pages with a source, up until sources seem to run out.
+    `max_src_page` is the highest page ID with a source anywhere in the
+    response, and `max_page` the highest page ID listed at all.
+    """
+    pages: dict[_PageId, Page]
+    max_src_page: Optional[_PageId]
+    max_page: Optional[_PageId]
+
+    @classmethod
+    def from_json(cls, res: dict) -> '_LookupDigest':
+        res_pages = res.get('page')
+        if res_pages is None:
+            # TODO: Not handled yet. What should we do here?
+            raise NoPagesInResponseException(
+                f"Expected 'pages' attribute in response but it "
+                f"was not found: {str(res)}"
+            )
 
-    def __init__(self, url: str):
-        super().__init__(url)
+        pages = {}
+        max_src_page = None
+        max_page = None
+
+        no_src_lim = 3
+        no_src_count = 0  # if no_src_lim is reached, assume we've run out of sources
+        for r_p in res_pages:
+            page_id = _PageId.from_id_str(r_p['pid'])
+            if max_page is None or max_page < page_id:
+                max_page = page_id
+
+            # Check if we have a source
+            url = r_p.get('src')
+            if url is None:
+                no_src_count += 1
+                continue
+
+            if max_src_page is None or max_src_page < page_id:
+                max_src_page = page_id
+            if no_src_count < no_src_lim:
+                # Reset the counter and keep the page
+                no_src_count = 0
+                pages[page_id] = Page(url=url, number=page_id)
+
+        return cls(pages, max_src_page, max_page)
+
+
+class _PageIndex:
+    """
+    The pages found so far in a crawl.
+
+    The highest page ID is kept up to date as pages are added, so finding it
+    only costs as much as the pages being added, rather than all the pages
+    found so far.
+    """
+    def __init__(self):
+        self._pages: dict[_PageId, Page] = {}
+        self.max: Optional[_PageId] = None
+
+    def update(self, pages: dict[_PageId, Page]) -> tuple[Page, ...]:
+        """
+        Returns the pages which hadn't been found before.
+        """
+        if not pages:
+            return ()
+        found = tuple(page for page_id, page in pages.items() if page_id not in self._pages)
+        self._pages.update(pages)
+        max_added = max(pages)
+        if self.max is None or self.max < max_added:
+            self.max = max_added
+        return found
+
+    def sorted(self) -> list[Page]:
+        return sorted(self._pages.values(), key=lambda p: p.number)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+class _Lookup(NamedTuple):
+    """
+    A lookup the crawl needs next, along with the lookups it will likely need
+    after that, which may be requested ahead of time, and the pages found by
+    the previous lookup.
+    """
+    url: URL
+    prefetch: tuple[URL, ...] = ()
+    found: tuple[Page, ...] = ()
+
+
+class _LookupPrefetcher:
+    """
+    Requests predicted lookups in the background while the current one is
+    being fetched and parsed.
+
+    Speculative requests which turn out not to be needed are cancelled if
+    they haven't started yet, and their responses are discarded otherwise.
+    When disabled, every lookup is simply requested when it's needed.
+    """
+    def __init__(self, get_response: Callable[[URL, Headers], BufferedResponse],
+                 enabled: bool = True, workers: int = 2):
+        self._get_response = get_response
+        self._executor = ThreadPoolExecutor(max_workers=workers) if enabled else None
+        self._speculative: dict[URL, Future] = {}
+
+    def prefetch(self, lookup: _Lookup, headers: Headers) -> None:
+        if self._executor is None:
+            return
+        for url in lookup.prefetch:
+            if url not in self._speculative:
+                self._speculative[url] = self._executor.submit(self._get_response, url, headers)
+        for url in [u for u in self._speculative if u != lookup.url and u not in lookup.prefetch]:
+            self._speculative.pop(url).cancel()
+
+    def fetch(self, url: URL, headers: Headers) -> BufferedResponse:
+        future = self._speculative.pop(url, None)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return self._get_response(url, headers)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            for future in self._speculative.values():
+                future.cancel()
+            self._executor.shutdown(wait=False)
+
+    def __enter__(self) -> '_LookupPrefetcher':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class GoogleBook(Book):
+    downloader = GoogleDownloader
+    session_class = GoogleSession
+
+    def __init__(
+            self,
+            url: str,
+            transport: Optional[BaseTransport] = None,
+            prefetch: bool = False,
+            cache: Optional[LookupCache] = None,
+            session: Optional[Session] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            cookie_jar: Optional[CookieJar] = None
+    ):
+        super().__init__(url, transport, prefetch, cache, session, retry_policy, cookie_jar)
         self._id = None
-        self._headers = GoogleRequestHeadersFactory.get_headers(kind=GoogleHeaderKinds.LOOKUP)
+        # Every page of the book, once a crawl has finished
+        self.pages: list[Page] = []
 
     @property
     def id(self) -> str:
@@ -130,45 +288,165 @@ class GoogleBook(Book, GoogleCookieMixin):
         an image source URL. If we don't get an image source, we continue on (by
         incrementing the page number for the next request).
         """
-        pages: dict[_PageId, Page] = {}
+        for _ in self.iter_pages():
+            pass
+        return self.pages
+
+    def iter_pages(self) -> Generator[Page, None, list[Page]]:
+        """
+        Yields each page as soon as a lookup response reveals it, and returns
+        the sorted pages once the whole preview has been seen.
+        """
+        crawl = self._crawl()
+        lookup = next(crawl)
+        seen = set()
+        with _LookupPrefetcher(self._get_response, enabled=self._prefetch) as prefetcher:
+            try:
+                while True:
+                    for page in lookup.found:
+                        seen.add(page.number)
+                        yield page
+                    res_json = self._get_cached_json(lookup.url)
+                    if res_json is None:
+                        headers = self.session.headers(GoogleHeaderKinds.LOOKUP)
+                        prefetcher.prefetch(self._uncached(lookup), headers)
+                        res = prefetcher.fetch(lookup.url, headers)
+                        res_json = self._handle_lookup_response(lookup.url, res)
+                    lookup = crawl.send(res_json)
+            except StopIteration as stop:
+                self.pages = stop.value
+        yield from (page for page in self.pages if page.number not in seen)
+        return self.pages
+
+    async def get_pages_async(self, client: 'AsyncClient') -> list[Page]:
+        """
+        Asynchronous counterpart of `get_pages()`, sending each lookup through `client`.
+        """
+        async for _ in self.iter_pages_async(client):
+            pass
+        return self.pages
+
+    async def iter_pages_async(self, client: 'AsyncClient') -> AsyncIterator[Page]:
+        """
+        Asynchronous counterpart of `iter_pages()`. Once it is exhausted, the
+        sorted pages are in `pages`.
+        """
+        import asyncio
+        crawl = self._crawl()
+        lookup = next(crawl)
+        seen = set()
+        speculative: dict[URL, asyncio.Task] = {}
+        try:
+            while True:
+                for page in lookup.found:
+                    seen.add(page.number)
+                    yield page
+                res_json = self._get_cached_json(lookup.url)
+                if res_json is None:
+                    headers = self.session.headers(GoogleHeaderKinds.LOOKUP)
+                    if self._prefetch:
+                        for url in self._uncached(lookup).prefetch:
+                            if url not in speculative:
+                                speculative[url] = asyncio.ensure_future(
+                                    self._get_response_async(client, url, headers)
+                                )
+                    task = speculative.pop(lookup.url, None)
+                    if task is None:
+                        task = self._get_response_async(client, lookup.url, headers)
+                    res = await task
+                    res_json = self._handle_lookup_response(lookup.url, res)
+                lookup = crawl.send(res_json)
+                for url in [u for u in speculative if u != lookup.url and u not in lookup.prefetch]:
+                    speculative.pop(url).cancel()
+        except StopIteration as stop:
+            self.pages = stop.value
+        finally:
+            for task in speculative.values():
+                task.cancel()
+        for page in self.pages:
+            if page.number not in seen:
+                yield page
+
+    def _crawl(self) -> Generator[_Lookup, dict, list[Page]]:
+        """
+        The lookup logic shared by `iter_pages()` and `iter_pages_async()`.
+
+        This generator performs no I/O itself: it yields each lookup to make
+        and expects to be sent the decoded JSON response for it in return.
+        Once the whole preview has been seen, the sorted pages are returned.
+        """
+        pages = _PageIndex()
+        found = ()
         current_page = _PageId(kind=1, num=1)
         max_page = _PageId(kind=1, num=1)
         prev_max_page = None
+        prev_page = None
 
         while True:
             write_current_page(current_page)
 
             # Start at PP1 and get every page possible
-            url = self._get_lookup_url(current_page)
-
-            # Send request to the URL and get the response
-            res = self._get_response(url, self._headers)
-            assert res.status == 200, f'Got a non-200 response: {res.status}'
-
-            # Set cookie
-            cookie = self.extract_cookies_from_response(res)
-            if cookie is not None:
-                self._headers.update(cookie)
-
-            res_json = self._get_json(res)
-            pages.update(self._extract_pages_from_json(res_json))
+            res_json = yield _Lookup(
+                url=self._get_lookup_url(current_page),
+                prefetch=tuple(
+                    self._get_lookup_url(p)
+                    for p in self._predict_next_pages(current_page, prev_page)
+                    if p < max_page
+                ),
+                found=found
+            )
+            digest = _LookupDigest.from_json(res_json)
+            found = pages.update(digest.pages)
 
-            max_from_json = self._get_max_page_from_json(res_json)
-            if max_page < max_from_json and max_page != prev_max_page:
+            max_from_json = digest.max_page
+            if max_from_json is not None and max_page < max_from_json and max_page != prev_max_page:
                 prev_max_page = max_page
                 max_page = max_from_json
                 write_max_page(max_page)
 
+            prev_page = current_page
             current_page = self._resolve_next_page(
                 current_page,
-                pages,
-                res_json
+                pages.max,
+                digest
             )
 
             if max_page == current_page:
                 break
 
-        return sorted(pages.values(), key=lambda p: p.number)
+        return pages.sorted()
+
+    def _handle_lookup_response(self, url: URL, res) -> dict:
+        # Error statuses have already been raised by the transport, but any
+        # other status without a lookup in its body is an error too
+        if res.status != 200:
+            raise urllib.error.HTTPError(
+                url, res.status, f'Got a non-200 response: {res.status}', res.headers, io.BytesIO(res.read())
+            )
+
+        self.session.update_cookies(res)
+
+        res_data = self._get_json_data(res)
+        if self._cache is not None:
+            self._cache.put(url, res_data)
+        return json.loads(res_data)
+
+    def _get_cached_json(self, url: URL) -> Optional[dict]:
+        if self._cache is None:
+            return None
+        res_data = self._cache.get(url)
+        if res_data is None:
+            return None
+        run_stats.count('lookups_cached')
+        return json.loads(res_data)
+
+    def _uncached(self, lookup: _Lookup) -> _Lookup:
+        """
+        Drop any lookups which would be served from the cache from those to prefetch.
+        """
+        if self._cache is None:
+            return lookup
+        return lookup._replace(prefetch=tuple(u for u in lookup.prefetch if u not in self._cache))
 
     def _get_lookup_url(self, page_id: str | _PageId) -> URL:
         query = urllib.parse.urlencode({
@@ -178,55 +456,44 @@ class GoogleBook(Book, GoogleCookieMixin):
             'source': 'entity_page',
             'jscmd': 'click3'
         })
-        tld = '.com'  # TODO: Extract and use TLD of original URL?
-        return f'https://books.google{tld}/books?{query}'
+        return f'{self._get_base_url()}/books?{query}'
 
     @staticmethod
-    def _get_response(url: URL, headers: Headers = None) -> http.client.HTTPResponse:
-        if headers is None:
-            headers = {}
-        req = urllib.request.Request(url, headers=headers)
-        res = urllib.request.urlopen(req)
-        return res
+    def _get_base_url() -> URL:
+        """
+        Lookups go to Google Books, unless the `GBOOKS_DL_GOOGLE_BASE_URL`
+        environment variable points them at a stand-in server, e.g. for benchmarking.
+        """
+        base_url = os.environ.get(BASE_URL_ENV_VAR)
+        if base_url:
+            return base_url.rstrip('/')
+        tld = '.com'  # TODO: Extract and use TLD of original URL?
+        return f'https://books.google{tld}'
 
-    @staticmethod
-    def _get_json(res) -> dict:
-        encoding = get_response_encoding(res)
-        res_data = res.read()
-        res_json = decompress_response_data(res_data, encoding)
-        return json.load(res_json)
+    def _get_response(self, url: URL, headers: Headers = None) -> BufferedResponse:
+        return self._retry_policy.call(self._fetch_lookup, url, headers)
 
-    @staticmethod
-    def _extract_pages_from_json(res: dict) -> dict[_PageId, Page]:
-        rtn = {}
-        res_pages = res.get('page')
+    def _fetch_lookup(self, url: URL, headers: Headers = None) -> BufferedResponse:
+        with run_stats.request('lookup'):
+            return self.session.transport.fetch(url, headers)
 
-        no_src_lim = 3
-        no_src_count = 0  # if no_src_lim is reached, assume we've run out of sources
-        if res_pages is None:
-            # TODO: Not handled yet. What should we do here?
-            raise NoPagesInResponseException(
-                f"Expected 'pages' attribute in response but it "
-                f"was not found: {str(res)}"
-            )
-        for r_p in res_pages:
-            # Check if we have a source
-            has_src = r_p.get('src') is not None
-            if not has_src:
-                no_src_count += 1
-                if no_src_lim == no_src_count:
-                    break
-                continue
+    async def _get_response_async(self, client: 'AsyncClient', url: URL, headers: Headers = None) -> BufferedResponse:
+        return await self._retry_policy.call_async(self._fetch_lookup_async, client, url, headers)
 
-            # Reset the counter and parse
-            no_src_count = 0
-            page_id = _PageId.from_id_str(r_p['pid'])
-            url = r_p['src']
-            rtn[page_id] = Page(url=url, number=page_id)
-        return rtn
+    async def _fetch_lookup_async(self, client: 'AsyncClient', url: URL, headers: Headers = None) -> BufferedResponse:
+        with run_stats.request('lookup'):
+            return await client.get(url, headers)
+
+    @staticmethod
+    def _get_json_data(res) -> bytes:
+        encoding = get_response_encoding(res)
+        res_data = res.read()
+        json_data = decompress_response_data(res_data, encoding).read()
+        run_stats.add_bytes(len(res_data), len(json_data))
+        return json_data
 
     @staticmethod
-    def _resolve_next_page(current_page: _PageId, pages: dict, response_data: dict) -> _PageId:
+    def _resolve_next_page(current_page: _PageId, max_found: _PageId, digest: _LookupDigest) -> _PageId:
         """
         Logic for getting the next PageId. If the next page (i.e. current_page + 1) is unavailable
         in the Google Books preview, then the page url is automatically incremented.
@@ -234,30 +501,30 @@ class GoogleBook(Book, GoogleCookieMixin):
         Otherwise, the max PageId of the current collection of pages is returned,
         which should return a response with data for the subsequent pages.
         """
-        response_pids = [
-            _PageId.from_id_str(p['pid'])
-            for p in response_data.get('page')
-            if p.get('src') is not None
-        ]
         # No srcs in response data? Try the URL again.
-        if not response_pids:
+        if digest.max_src_page is None:
             return _PageId(kind=current_page.kind, num=current_page.num + 1)
 
         # More page IDs are available, so keep going
-        if max(response_pids) > current_page:
-            return max(pages)
+        if max_found is not None and digest.max_src_page > current_page:
+            return max_found
 
         # Manually increment the page ID
         return _PageId(kind=current_page.kind, num=current_page.num + 1)
 
     @staticmethod
-    def _get_max_page_from_json(res: dict):
-        res_pages = res.get('page')
-        return max([_PageId.from_id_str(r['pid']) for r in res_pages])
+    def _predict_next_pages(current_page: _PageId, prev_page: Optional[_PageId]) -> list[_PageId]:
+        """
+        Guess which lookups are likely to follow the one for `current_page`,
+        before its response has been seen.
 
-    @property
-    def cookie(self) -> Optional[tuple[str, str]]:
-        cookie = self._headers.get('cookie')
-        if cookie is not None:
-            return 'cookie', cookie
-        return None
+        `_resolve_next_page()` either increments the page number, or jumps to
+        the highest page found so far. The size of that jump can't be known
+        until the response arrives, so we assume it will match the last one.
+        """
+        candidates = [_PageId(kind=current_page.kind, num=current_page.num + 1)]
+        if prev_page is not None and prev_page.kind == current_page.kind:
+            stride = current_page.num - prev_page.num
+            if stride > 1:
+                candidates.append(_PageId(kind=current_page.kind, num=current_page.num + stride))
+        return candidates
@@ -3,7 +3,6 @@ Many thanks to youtube-dl project for providing a solution to the 'CONSENT' prob
 """
 import re
 import random
-import http.client
 from typing import Optional
 from http.cookies import SimpleCookie, Morsel
 
@@ -50,17 +49,3 @@ class GoogleCookie(SimpleCookie):
     @property
     def consent_id(self) -> str:
         return self._get_consent_id()
-
-
-class GoogleCookieMixin:
-    @staticmethod
-    def extract_cookies_from_response(res: http.client.HTTPResponse) -> Optional[dict[str, str]]:
-        # Set cookie
-        morsels = [
-            v.split(';')[0]
-            for k, v in res.info().items()
-            if k == 'Set-Cookie'
-        ]
-        if morsels:
-            return {'cookie': GoogleCookie('; '.join(morsels)).output()}
-        return None
@@ -1,20 +1,36 @@
 import re
 import locale
+import functools
 from enum import Enum, auto
 from typing import Optional
 
+from gbooks_dl.decompress import accept_encoding
 from gbooks_dl.books.base.headers import Headers, HeadersKind, RequestHeadersFactory
-from gbooks_dl.utils import random_user_agent
+from gbooks_dl.useragent import random_user_agent
+
+_LOCALE_PATTERN = re.compile(r"(\w{2})(_)(\w{2})")
+
+# Sent when the locale is unset, or isn't of the usual 'en_US' form
+_DEFAULT_ACCEPT_LANGUAGE = 'en-US,en;q=0.6'
 
 
 class GoogleHeaderKinds(Enum):
-    LOOKUP = auto
-    PAGE_IMAGE = auto
+    LOOKUP = auto()
+    PAGE_IMAGE = auto()
+
+
+@functools.cache
+def _accept_language() -> str:
+    loc = locale.getlocale()[0]
+    match = _LOCALE_PATTERN.match(loc) if loc is not None else None
+    if match is None:
+        return _DEFAULT_ACCEPT_LANGUAGE
+    return '{}-{},{};q=0.6'.format(match.group(1), match.group(3), match.group(1).lower())
 
 
 class GoogleRequestHeadersFactory(RequestHeadersFactory):
     @staticmethod
-    def get_headers(*, kind: Optional[HeadersKind] = None) -> Headers:
+    def get_headers(*, kind: Optional[HeadersKind] = None, user_agent: Optional[str] = None) -> Headers:
         if kind == GoogleHeaderKinds.LOOKUP:
             accept = 'application/json'
             sec_fetch_dest = 'empty'
@@ -24,25 +40,13 @@ class GoogleRequestHeadersFactory(RequestHeadersFactory):
         else:
             accept = '*/*'
             sec_fetch_dest = 'empty'
-        loc = locale.getlocale()[0]
-        loc_pat = re.compile(r"(\w{2})(_)(\w{2})")
         return {
             'accept': accept,
-            'accept-encoding': 'gzip',
-            'accept-language': '{},{};q=0.6'.format(
-                re.sub(
-                    loc_pat,
-                    lambda m: f"{m.group(1)}-{m.group(3)}",
-                    loc
-                ),
-                re.match(
-                    loc_pat,
-                    loc
-                ).group(1).lower()
-            ),
+            'accept-encoding': accept_encoding(),
+            'accept-language': _accept_language(),
             'sec-fetch-dest': sec_fetch_dest,
             'sec-fetch-mode': 'cors',
             'sec-fetch-site': 'same-origin',
             'sec-gpc': 1,
-            'user-agent': random_user_agent()
+            'user-agent': user_agent if user_agent is not None else random_user_agent()
         }
@@ -0,0 +1,9 @@
+from gbooks_dl.session import Session
+from gbooks_dl.books.providers.google.cookie import GoogleCookie
+from gbooks_dl.books.providers.google.headers import GoogleRequestHeadersFactory
+
+
+class GoogleSession(Session):
+    name = 'google'
+    headers_factory = GoogleRequestHeadersFactory
+    cookie_class = GoogleCookie
@@ -1,16 +1,25 @@
-from gbooks_dl.books.base.book import Book
-from gbooks_dl.books.providers.google import GoogleBook
+import importlib
 
-
-PROVIDERS = {
-    'google',
+# The book class of each provider, as 'module:class'. A provider's module is
+# only imported once a URL has been found to belong to it, so picking the
+# provider doesn't cost the import of every provider.
+PROVIDER_BOOKS = {
+    'google': 'gbooks_dl.books.providers.google.book:GoogleBook',
 }
 
+PROVIDERS = set(PROVIDER_BOOKS)
+
+
+def get_provider_book_class(provider: str) -> type | None:
+    path = PROVIDER_BOOKS.get(provider)
+    if path is None:
+        return None
+    module_name, class_name = path.split(':')
+    return getattr(importlib.import_module(module_name), class_name)
+
 
-def get_provider_book(provider: str, *a, **kw) -> Book | None:
-    provider_book = {
-        'google': GoogleBook
-    }.get(provider)
+def get_provider_book(provider: str, *a, **kw):
+    provider_book = get_provider_book_class(provider)
 
     if provider_book is not None:
         return provider_book(*a, **kw)
@@ -0,0 +1,100 @@
+import os
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+
+class LookupCache:
+    """
+    On-disk cache of decoded lookup responses.
+
+    Each entry is stored in its own file, named after a hash of its key. A
+    file's modification time records when the entry was stored, so it can
+    expire after `ttl` seconds, and its access time is bumped on every hit,
+    so the least recently used entries are evicted first once the cache
+    grows past `max_size` bytes.
+
+    Entries are written to a temporary file and renamed into place, so the
+    same cache folder can be shared by several processes.
+    """
+    def __init__(self, path: os.PathLike | str, ttl: float = DEFAULT_TTL, max_size: int = DEFAULT_MAX_SIZE):
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._ttl = ttl
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._size = sum(fp.stat().st_size for fp in self._entries())
+
+    def get(self, key: str) -> Optional[bytes]:
+        fp = self._get_fp(key)
+        try:
+            st = fp.stat()
+            if time.time() - st.st_mtime > self._ttl:
+                with self._lock:
+                    self._size -= self._remove(fp)
+                return None
+            with open(fp, 'rb') as f:
+                data = f.read()
+            os.utime(fp, (time.time(), st.st_mtime))
+        except FileNotFoundError:
+            return None
+        return data
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return time.time() - self._get_fp(key).stat().st_mtime <= self._ttl
+        except FileNotFoundError:
+            return False
+
+    def put(self, key: str, data: bytes) -> None:
+        fp = self._get_fp(key)
+        tmp_fp = fp.with_name(f'{fp.name}.{os.getpid()}.{threading.get_ident()}.part')
+        with open(tmp_fp, 'wb') as f:
+            f.write(data)
+        try:
+            replaced_size = fp.stat().st_size
+        except FileNotFoundError:
+            replaced_size = 0
+        os.replace(tmp_fp, fp)
+
+        with self._lock:
+            self._size += len(data) - replaced_size
+            if self._size > self._max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is back
+        comfortably under its size limit, so eviction doesn't run on every put.
+        """
+        target = self._max_size * 0.9
+        entries = []
+        for fp in self._entries():
+            try:
+                entries.append((fp.stat().st_atime, fp))
+            except FileNotFoundError:
+                continue
+        for _, fp in sorted(entries):
+            if self._size <= target:
+                break
+            self._size -= self._remove(fp)
+
+    @staticmethod
+    def _remove(fp: Path) -> int:
+        try:
+            size = fp.stat().st_size
+            fp.unlink()
+        except FileNotFoundError:
+            return 0
+        return size
+
+    def _entries(self):
+        return self._path.glob('*.cache')
+
+    def _get_fp(self, key: str) -> Path:
+        return Path(self._path, hashlib.sha256(key.encode()).hexdigest() + '.cache')
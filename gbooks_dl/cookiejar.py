@@ -0,0 +1,179 @@
+"""
+A cookie jar kept on disk, so a run can carry on with the cookies of the runs
+before it instead of starting a new session with the provider every time.
+
+The jar is one JSON file holding each provider's cookies, along with when
+each cookie expires and when it was last set. It is only ever replaced by
+renaming a complete file into place, so it can be read at any time, and
+saving takes a lock on it, so several processes can share the same jar.
+"""
+import os
+import json
+import time
+import uuid
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple, Optional, Iterable
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# How long a cookie set without an expiry is kept for, from when it was last set
+DEFAULT_SESSION_TTL = 24 * 60 * 60
+
+
+class StoredCookie(NamedTuple):
+    name: str
+    # As it was sent in the Set-Cookie header, i.e. quoted if need be
+    value: str
+    # When the cookie expires, as a timestamp, or None if it expires with the session
+    expires: Optional[float]
+    # When the cookie was last set, which decides between copies of it
+    updated: float
+
+
+def cookie_expiry(attributes: Iterable[str], now: float) -> Optional[float]:
+    """
+    Works out when a cookie expires from the attributes which follow its
+    value in a Set-Cookie header, e.g. ['Path=/', 'Max-Age=3600'], as a
+    timestamp. Max-Age takes precedence over Expires, as it does in browsers.
+    """
+    expires = None
+    for attribute in attributes:
+        key, _, value = attribute.partition('=')
+        key = key.strip().lower()
+        if key == 'max-age':
+            try:
+                return now + int(value.strip())
+            except ValueError:
+                continue
+        elif key == 'expires':
+            try:
+                date = parsedate_to_datetime(value.strip())
+            except (TypeError, ValueError):
+                continue
+            if date.tzinfo is None:
+                date = date.replace(tzinfo=timezone.utc)
+            expires = date.timestamp()
+    return expires
+
+
+class CookieJar:
+    """
+    Cookies are kept under the name of the session they came from, so one jar
+    can hold the cookies of every provider. Cookies which were set without an
+    expiry are kept for `session_ttl` seconds after they were last set.
+
+    When several processes save the same cookie, the one set last is kept, so
+    a process which merely loaded a cookie never replaces a newer one.
+    """
+    def __init__(self, path: os.PathLike | str, session_ttl: float = DEFAULT_SESSION_TTL):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self._path.with_name(f'{self._path.name}.lock')
+        self._session_ttl = session_ttl
+
+    def load(self, name: str) -> list[StoredCookie]:
+        """
+        The cookies kept for session `name` which haven't expired yet.
+        """
+        now = time.time()
+        return [
+            cookie
+            for cookie in self._read().get(name, {}).values()
+            if not self._is_expired(cookie, now)
+        ]
+
+    def save(self, name: str, cookies: Iterable[StoredCookie]) -> None:
+        """
+        Merges `cookies` into those kept for session `name`. A cookie which
+        has expired, e.g. one deleted by the provider, removes any older copy
+        of it from the jar, and expired cookies are dropped from the jar.
+        """
+        now = time.time()
+        with self._locked():
+            sessions = self._read()
+            kept = sessions.setdefault(name, {})
+            for cookie in cookies:
+                current = kept.get(cookie.name)
+                if current is None or cookie.updated >= current.updated:
+                    kept[cookie.name] = cookie
+            for session_name, session_cookies in list(sessions.items()):
+                session_cookies = {
+                    cookie_name: cookie
+                    for cookie_name, cookie in session_cookies.items()
+                    if not self._is_expired(cookie, now)
+                }
+                if session_cookies:
+                    sessions[session_name] = session_cookies
+                else:
+                    del sessions[session_name]
+            self._write(sessions)
+
+    def _is_expired(self, cookie: StoredCookie, now: float) -> bool:
+        expires = cookie.expires if cookie.expires is not None else cookie.updated + self._session_ttl
+        return expires <= now
+
+    def _read(self) -> dict[str, dict[str, StoredCookie]]:
+        try:
+            with open(self._path, encoding='utf-8') as f:
+                data = json.load(f)
+            sessions = {}
+            for session_name, session_cookies in data['sessions'].items():
+                sessions[session_name] = {
+                    cookie_name: StoredCookie(cookie_name, c['value'], c['expires'], c['updated'])
+                    for cookie_name, c in session_cookies.items()
+                }
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Not a jar we wrote; start it afresh rather than fail the run
+            return {}
+        return sessions
+
+    def _write(self, sessions: dict[str, dict[str, StoredCookie]]) -> None:
+        data = {
+            'sessions': {
+                session_name: {
+                    cookie.name: {'value': cookie.value, 'expires': cookie.expires, 'updated': cookie.updated}
+                    for cookie in session_cookies.values()
+                }
+                for session_name, session_cookies in sessions.items()
+            }
+        }
+        tmp_path = self._path.with_name(f'{self._path.name}.{uuid.uuid4().hex}.part')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=1)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Holds the jar's lock, which is taken on a file of its own, as the
+        jar itself is replaced whenever it is saved.
+        """
+        with open(self._lock_path, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
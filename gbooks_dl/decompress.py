@@ -0,0 +1,229 @@
+"""
+The content encodings gbooks-dl can decompress.
+
+gzip and deflate are always available, through zlib. br and zstd are
+available when a library for them is installed: brotli (or brotlicffi) for
+br, and, before Python 3.14 brought it into the standard library, zstandard
+for zstd. The Accept-Encoding header sent to providers lists exactly the
+encodings available, so they never send one we can't decompress.
+
+Every encoding is decompressed incrementally, so a body can be decompressed
+as it arrives, without holding all of it in memory.
+"""
+import zlib
+import functools
+import importlib
+from abc import ABC, abstractmethod
+from typing import Callable, Iterator, Optional
+
+from gbooks_dl.exceptions import CannotDecompressResponseException
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class Decompressor(ABC):
+    """
+    Decompresses one body, a piece at a time.
+    """
+    @abstractmethod
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Yields what `data`, the next piece of the body, decompresses to. Where
+        the library allows, the output is yielded `chunk_size` bytes at a
+        time, so a small piece which decompresses to a lot isn't held in
+        memory all at once.
+        """
+        ...
+
+    def flush(self) -> bytes:
+        """
+        What is left of the output once the whole body has been given.
+        """
+        return b''
+
+
+class ZlibDecompressor(Decompressor):
+    def __init__(self, wbits: int):
+        self._decompressor = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        output = self._decompressor.decompress(data, chunk_size)
+        while output:
+            yield output
+            output = self._decompressor.decompress(self._decompressor.unconsumed_tail, chunk_size)
+
+    def flush(self) -> bytes:
+        return self._decompressor.flush()
+
+
+class GzipDecompressor(ZlibDecompressor):
+    def __init__(self):
+        # Also accepts a zlib header, in case a server mislabels one
+        super().__init__(zlib.MAX_WBITS | 32)
+
+
+class DeflateDecompressor(ZlibDecompressor):
+    """
+    'deflate' is meant to be zlib-wrapped, but some servers send raw deflate
+    data instead, which is told apart by the first piece of the body.
+    """
+    def __init__(self):
+        super().__init__(zlib.MAX_WBITS)
+        self._started = False
+
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        if not self._started:
+            self._started = True
+            try:
+                first = self._decompressor.decompress(data, chunk_size)
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                first = self._decompressor.decompress(data, chunk_size)
+            if first:
+                yield first
+                yield from super().decompress(self._decompressor.unconsumed_tail, chunk_size)
+            return
+        yield from super().decompress(data, chunk_size)
+
+
+class BrotliDecompressor(Decompressor):
+    def __init__(self, brotli):
+        self._decompressor = brotli.Decompressor()
+        # Only recent versions of brotli can limit the output of each call
+        self._limited = hasattr(self._decompressor, 'can_accept_more_data')
+
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        if not self._limited:
+            output = self._decompressor.process(bytes(data))
+            if output:
+                yield output
+            return
+        output = self._decompressor.process(bytes(data), output_buffer_limit=chunk_size)
+        while output:
+            yield output
+            # Output which reached the limit may have more held back behind it
+            if len(output) < chunk_size and self._decompressor.can_accept_more_data():
+                break
+            output = self._decompressor.process(b'', output_buffer_limit=chunk_size)
+
+
+class BoundedDecompressor(Decompressor):
+    """
+    Wraps a decompressor with the interface of the standard library's lzma,
+    bz2 and, from Python 3.14, zstd modules, which limit their output with
+    `max_length` and keep the input they haven't got to yet.
+    """
+    def __init__(self, decompressor):
+        self._decompressor = decompressor
+
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        if self._decompressor.eof:
+            return
+        output = self._decompressor.decompress(data, chunk_size)
+        while output:
+            yield output
+            if self._decompressor.eof or self._decompressor.needs_input:
+                break
+            output = self._decompressor.decompress(b'', chunk_size)
+
+
+class ZstandardDecompressor(Decompressor):
+    def __init__(self, zstandard):
+        self._decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    def decompress(self, data: bytes, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        output = self._decompressor.decompress(bytes(data))
+        if output:
+            yield output
+
+
+DecompressorFactory = Callable[[], Decompressor]
+
+
+def _brotli_factory() -> Optional[DecompressorFactory]:
+    for module_name in ('brotli', 'brotlicffi'):
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        return lambda: BrotliDecompressor(module)
+    return None
+
+
+def _zstd_factory() -> Optional[DecompressorFactory]:
+    try:
+        from compression import zstd
+    except ImportError:
+        ...
+    else:
+        return lambda: BoundedDecompressor(zstd.ZstdDecompressor())
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return lambda: ZstandardDecompressor(zstandard)
+
+
+# Every encoding gbooks-dl knows, in the order they are listed in Accept-Encoding,
+# with a function returning the factory of their decompressors, or None if the
+# library they need isn't installed.
+ENCODINGS: dict[str, Callable[[], Optional[DecompressorFactory]]] = {
+    'gzip': lambda: GzipDecompressor,
+    'deflate': lambda: DeflateDecompressor,
+    'br': _brotli_factory,
+    'zstd': _zstd_factory,
+}
+
+# Other names servers use for the same encodings
+_ALIASES = {
+    'x-gzip': 'gzip',
+}
+
+
+@functools.cache
+def available_decompressors() -> dict[str, DecompressorFactory]:
+    """
+    The factory of each encoding which can be decompressed with what is installed.
+    """
+    factories = {}
+    for encoding, load in ENCODINGS.items():
+        factory = load()
+        if factory is not None:
+            factories[encoding] = factory
+    return factories
+
+
+@functools.cache
+def accept_encoding() -> str:
+    """
+    The value of the Accept-Encoding header, listing every available encoding.
+    """
+    return ', '.join(available_decompressors())
+
+
+def get_decompressor(encoding: Optional[str]) -> Optional[Decompressor]:
+    """
+    Returns a new decompressor for the content encoding `encoding`, or None
+    if the data isn't compressed.
+    """
+    if encoding is None:
+        return None
+    encoding = encoding.strip().lower()
+    if encoding in ('', 'identity'):
+        return None
+    factory = available_decompressors().get(_ALIASES.get(encoding, encoding))
+    if factory is None:
+        raise CannotDecompressResponseException(
+            f"Can't decompress response with encoding {encoding}"
+        )
+    return factory()
+
+
+def decompress(data: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Decompresses a whole body at once.
+    """
+    decompressor = get_decompressor(encoding)
+    if decompressor is None:
+        return data
+    return b''.join(decompressor.decompress(data)) + decompressor.flush()
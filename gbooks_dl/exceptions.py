@@ -24,3 +24,11 @@ class NoRegisteredProviderException(ProviderException):
 
 class BookException(GBooksDlException):
     ...
+
+
+class DownloadIncompleteException(GBooksDlHttpException):
+    ...
+
+
+class UnsupportedImageException(GBooksDlException):
+    ...
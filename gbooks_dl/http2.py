@@ -0,0 +1,468 @@
+"""
+An HTTP/2 transport, built on the h2 package, which is an optional dependency
+(pip install 'gbooks-dl[http2]').
+
+Over HTTP/1.1, a connection carries one request at a time, so `jobs` pages
+in flight need `jobs` connections, each with its own handshakes. HTTP/2
+multiplexes any number of requests as streams on a single connection, so
+`Http2Transport` keeps one connection per host, which every thread sends its
+requests down at once.
+
+h2 only implements the protocol, so each connection has a thread of its own
+which reads from the socket and hands the frames it receives to the streams
+they belong to.
+"""
+import queue
+import socket
+import ssl
+import threading
+import http.client
+from http import HTTPStatus
+from typing import Optional
+
+import h2.config
+import h2.events
+import h2.settings
+import h2.connection
+import h2.exceptions
+import h2.errors
+
+from gbooks_dl.ratelimit import AdaptiveRateLimiter
+from gbooks_dl.transport import Transport, split_url, _PoolKey
+
+# How much of each response, and of all the responses on a connection, the
+# server may send ahead of it being read. Far more than the default of 64 KiB,
+# so a page image can be sent without waiting on the reader.
+STREAM_WINDOW_SIZE = 1024 * 1024
+CONNECTION_WINDOW_SIZE = 16 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+# Headers which only apply to HTTP/1.1, and mustn't be sent over HTTP/2
+_CONNECTION_HEADERS = {'connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade', 'host', 'te'}
+
+# What a stream's queue is given in place of data once the response has ended
+_END = object()
+
+
+class _ConnectionUnusable(Exception):
+    """
+    No more streams can be started on the connection, e.g. it has been closed
+    or the server has asked for it to be, so a new one is needed.
+    """
+
+
+class Http2Response:
+    """
+    The response on a single stream. Like `PooledResponse`, it supports the
+    parts of `http.client.HTTPResponse` the rest of the project relies on.
+
+    The server can only send as much of the body as has been read, and
+    closing a response before reading it to the end cancels its stream.
+    """
+    def __init__(self, conn: 'Http2Connection', stream_id: int, chunks: queue.Queue,
+                 status: int, headers: http.client.HTTPMessage, url: str, timeout: Optional[float]):
+        self._conn = conn
+        self._stream_id = stream_id
+        self._chunks = chunks
+        self._buffer = bytearray()
+        self._ended = False
+        self._closed = False
+        self._timeout = timeout
+        self.status = status
+        self.headers = headers
+        self.url = url
+        try:
+            self.reason = HTTPStatus(status).phrase
+        except ValueError:
+            self.reason = ''
+
+    def info(self) -> http.client.HTTPMessage:
+        return self.headers
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name, default)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        while (amt is None or len(self._buffer) < amt) and self._receive():
+            ...
+        if amt is None:
+            amt = len(self._buffer)
+        data = bytes(self._buffer[:amt])
+        del self._buffer[:amt]
+        return data
+
+    def readinto(self, b) -> int:
+        # Empty DATA frames, e.g. one which only ends the stream, give no data,
+        # and 0 is only returned once the body has ended
+        while not self._buffer and self._receive():
+            ...
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._conn.close_stream(self._stream_id, self._chunks, reset=not self._ended)
+
+    def _receive(self) -> bool:
+        """
+        Waits for the next chunk of the body. Returns False once there are no more.
+        """
+        if self._ended:
+            return False
+        try:
+            item = self._chunks.get(timeout=self._timeout)
+        except queue.Empty:
+            self.close()
+            raise TimeoutError(f'Timed out reading the response from {self.url}') from None
+        if item is _END:
+            self._ended = True
+            self.close()
+            return False
+        if isinstance(item, BaseException):
+            self._ended = True
+            self.close()
+            raise item
+        data, flow_controlled_length = item
+        self._buffer += data
+        # Only now that it has been read may the server send more in its place
+        self._conn.acknowledge(self._stream_id, flow_controlled_length)
+        return True
+
+    def __enter__(self) -> 'Http2Response':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Http2Connection:
+    """
+    A single HTTP/2 connection, which any number of threads can send requests on.
+
+    The streams in flight are capped at the server's SETTINGS_MAX_CONCURRENT_STREAMS,
+    and further requests wait for one of them to finish.
+    """
+    def __init__(self, sock: socket.socket, key: _PoolKey):
+        self._sock = sock
+        self._scheme, host, port = key
+        self._authority = host if port in (80, 443) else f'{host}:{port}'
+        self._h2 = h2.connection.H2Connection(h2.config.H2Configuration(client_side=True, header_encoding='latin-1'))
+        self._h2.local_settings = h2.settings.Settings(client=True, initial_values={
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: STREAM_WINDOW_SIZE,
+        })
+        self._streams: dict[int, queue.Queue] = {}
+        self._error: Optional[BaseException] = None
+        self._closing = False
+        # Whether a thread is writing to the socket
+        self._sending = False
+        self._cond = threading.Condition()
+
+        with self._cond:
+            self._h2.initiate_connection()
+            self._h2.increment_flow_control_window(CONNECTION_WINDOW_SIZE - self._h2.inbound_flow_control_window)
+        self._flush()
+        threading.Thread(target=self._read_frames, daemon=True).start()
+
+    @property
+    def usable(self) -> bool:
+        return self._error is None and not self._closing
+
+    def start_request(self, target: str, headers: dict) -> tuple[int, queue.Queue]:
+        """
+        Sends a GET request for `target` on a new stream, and returns the
+        stream's ID and the queue its response is handed to.
+        """
+        request_headers = [
+            (':method', 'GET'),
+            (':scheme', self._scheme),
+            (':authority', self._authority),
+            (':path', target),
+        ]
+        request_headers += [
+            (k.lower(), str(v)) for k, v in headers.items() if k.lower() not in _CONNECTION_HEADERS
+        ]
+        with self._cond:
+            while self.usable and (
+                self._h2.open_outbound_streams >= self._h2.remote_settings.max_concurrent_streams
+            ):
+                self._cond.wait()
+            if not self.usable:
+                raise _ConnectionUnusable()
+            try:
+                stream_id = self._h2.get_next_available_stream_id()
+            except h2.exceptions.NoAvailableStreamIDError:
+                self._closing = True
+                raise _ConnectionUnusable() from None
+            chunks = queue.Queue()
+            self._streams[stream_id] = chunks
+            self._h2.send_headers(stream_id, request_headers, end_stream=True)
+        self._flush()
+        return stream_id, chunks
+
+    def acknowledge(self, stream_id: int, flow_controlled_length: int) -> None:
+        with self._cond:
+            if self._error is not None:
+                return
+            self._h2.acknowledge_received_data(flow_controlled_length, stream_id)
+        self._flush()
+
+    def close_stream(self, stream_id: int, chunks: queue.Queue, reset: bool) -> None:
+        """
+        Forgets a stream once its response is done with. If it hasn't been
+        read to the end, the stream is cancelled, and the data the server sent
+        on it in the meantime is acknowledged, so it doesn't count against the
+        connection.
+        """
+        with self._cond:
+            self._streams.pop(stream_id, None)
+            if self._error is not None:
+                return
+            unread = 0
+            while True:
+                try:
+                    item = chunks.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, tuple):
+                    unread += item[1]
+            if unread:
+                self._h2.acknowledge_received_data(unread, stream_id)
+            if reset:
+                try:
+                    self._h2.reset_stream(stream_id, h2.errors.ErrorCodes.CANCEL)
+                except h2.exceptions.ProtocolError:
+                    # The server finished sending it in the meantime
+                    ...
+            self._cond.notify_all()
+        try:
+            self._flush()
+        except OSError:
+            ...
+
+    def close(self) -> None:
+        with self._cond:
+            closing = self._error is None
+            if closing:
+                self._closing = True
+                self._h2.close_connection()
+        if closing:
+            try:
+                self._flush()
+            except OSError:
+                ...
+        with self._cond:
+            self._fail(ConnectionAbortedError('The connection was closed'))
+
+    def _read_frames(self) -> None:
+        try:
+            while True:
+                data = self._sock.recv(READ_SIZE)
+                if not data:
+                    raise ConnectionResetError('The server closed the connection')
+                with self._cond:
+                    for event in self._h2.receive_data(data):
+                        self._handle_event(event)
+                    self._cond.notify_all()
+                self._flush()
+        except Exception as exc:
+            # Failed streams are retried like any other dropped connection
+            if not isinstance(exc, OSError):
+                exc = ConnectionResetError(f'HTTP/2 connection failed: {exc!r}')
+            with self._cond:
+                self._fail(exc)
+
+    def _handle_event(self, event: h2.events.Event) -> None:
+        stream_id = getattr(event, 'stream_id', None)
+        chunks = self._streams.get(stream_id)
+        if isinstance(event, h2.events.ResponseReceived):
+            if chunks is not None:
+                chunks.put(event.headers)
+        elif isinstance(event, h2.events.DataReceived):
+            if chunks is not None:
+                chunks.put((event.data, event.flow_controlled_length))
+            else:
+                # The stream has been closed on our side, so nobody will read it
+                self._h2.acknowledge_received_data(event.flow_controlled_length, stream_id)
+        elif isinstance(event, h2.events.StreamEnded):
+            if chunks is not None:
+                chunks.put(_END)
+        elif isinstance(event, h2.events.StreamReset):
+            if chunks is not None:
+                chunks.put(ConnectionResetError(f'The server reset the stream ({event.error_code!r})'))
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self._closing = True
+            # Streams past the last one the server processed never will be,
+            # so they can safely be sent again on a new connection
+            last_stream_id = event.last_stream_id if event.last_stream_id is not None else 0
+            for sid, stream_chunks in list(self._streams.items()):
+                if sid > last_stream_id:
+                    stream_chunks.put(ConnectionResetError('The server closed the connection'))
+
+    def _flush(self) -> None:
+        """
+        Sends the frames h2 has queued up. It must be called without holding
+        `_cond`, as `sendall` can block until the server reads what it was
+        sent, which it may only do once the reader thread, which needs
+        `_cond`, has taken in what it sent us, e.g. its WINDOW_UPDATE frames.
+
+        Only one thread writes to the socket at a time, and it also sends the
+        frames other threads queue up in the meantime, so they stay in order.
+        """
+        with self._cond:
+            if self._sending:
+                return
+            self._sending = True
+        try:
+            while True:
+                with self._cond:
+                    data = self._h2.data_to_send()
+                    if not data:
+                        self._sending = False
+                        return
+                self._sock.sendall(data)
+        except BaseException as exc:
+            with self._cond:
+                self._sending = False
+                if isinstance(exc, OSError):
+                    self._fail(exc)
+            raise
+
+    def _fail(self, exc: BaseException) -> None:
+        """
+        Marks the connection as broken, failing every stream still in flight on it.
+        """
+        if self._error is not None:
+            return
+        self._error = exc
+        for chunks in self._streams.values():
+            chunks.put(exc)
+        self._streams.clear()
+        try:
+            self._sock.close()
+        except OSError:
+            ...
+        self._cond.notify_all()
+
+
+class Http2Transport(Transport):
+    """
+    Sends GET requests over HTTP/2 to the hosts which support it, multiplexed
+    on a single connection per host, and over pooled HTTP/1.1 connections, as
+    `Transport` does, to the hosts which don't.
+
+    Whether an https host supports HTTP/2 is negotiated during the TLS
+    handshake (ALPN). Plain http hosts are only spoken to over HTTP/2 with
+    `prior_knowledge` that they support it, e.g. a local stand-in server.
+    """
+    def __init__(
+            self,
+            pool_size: int = 8,
+            idle_timeout: float = 30.0,
+            timeout: Optional[float] = None,
+            rate_limiter: Optional[AdaptiveRateLimiter] = None,
+            prior_knowledge: bool = False
+    ):
+        super().__init__(pool_size, idle_timeout, timeout, rate_limiter)
+        self._timeout = timeout
+        self._prior_knowledge = prior_knowledge
+        self._ssl_context = ssl.create_default_context()
+        self._ssl_context.set_alpn_protocols(['h2', 'http/1.1'])
+        self._connections: dict[_PoolKey, Http2Connection] = {}
+        # Hosts which turned out not to support HTTP/2
+        self._http1_hosts: set[_PoolKey] = set()
+        # Held while connecting to each host, so only one connection is opened to it at a time
+        self._connect_locks: dict[_PoolKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for conn in connections:
+            conn.close()
+        super().close()
+
+    def _request(self, url: str, headers: dict):
+        key, target = split_url(url)
+        # A connection may become unusable between being picked and being
+        # used, in which case the request is sent on a new one
+        for _ in range(2):
+            conn = self._get_connection(key)
+            if conn is None:
+                return super()._request(url, headers)
+            try:
+                stream_id, chunks = conn.start_request(target, headers)
+            except _ConnectionUnusable:
+                continue
+            return self._get_response(conn, stream_id, chunks, url)
+        raise ConnectionResetError(f'Could not start a stream to {key[1]}')
+
+    def _get_response(self, conn: Http2Connection, stream_id: int, chunks: queue.Queue, url: str) -> Http2Response:
+        try:
+            item = chunks.get(timeout=self._timeout)
+        except queue.Empty:
+            conn.close_stream(stream_id, chunks, reset=True)
+            raise TimeoutError(f'Timed out waiting for a response from {url}') from None
+        if isinstance(item, BaseException):
+            conn.close_stream(stream_id, chunks, reset=False)
+            raise item
+        headers = http.client.HTTPMessage()
+        status = 0
+        for name, value in item:
+            if name == ':status':
+                status = int(value)
+            elif not name.startswith(':'):
+                # Header names are lower case in HTTP/2, and title case
+                # everywhere else in the project
+                headers[name.title()] = value
+        return Http2Response(conn, stream_id, chunks, status, headers, url, self._timeout)
+
+    def _get_connection(self, key: _PoolKey) -> Optional[Http2Connection]:
+        """
+        The HTTP/2 connection to the host of `key`, opening one if need be,
+        or None if requests to it are to be sent over HTTP/1.1.
+        """
+        scheme = key[0]
+        if key in self._http1_hosts or (scheme != 'https' and not self._prior_knowledge):
+            return None
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is not None and conn.usable:
+                return conn
+            connect_lock = self._connect_locks.setdefault(key, threading.Lock())
+        # The handshakes happen outside `_lock`, so requests to other hosts,
+        # and `close`, aren't held up by them
+        with connect_lock:
+            with self._lock:
+                conn = self._connections.get(key)
+            if conn is not None and conn.usable:
+                # Another thread connected in the meantime
+                return conn
+            sock = self._connect(key)
+            if sock is None:
+                with self._lock:
+                    self._http1_hosts.add(key)
+                return None
+            conn = Http2Connection(sock, key)
+            with self._lock:
+                self._connections[key] = conn
+            return conn
+
+    def _connect(self, key: _PoolKey) -> Optional[socket.socket]:
+        scheme, host, port = key
+        sock = socket.create_connection((host, port), timeout=self._timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if scheme == 'https':
+            sock = self._ssl_context.wrap_socket(sock, server_hostname=host)
+            if sock.selected_alpn_protocol() != 'h2':
+                sock.close()
+                return None
+        # Reads block on the connection's own thread until a frame arrives,
+        # and responses time out instead
+        sock.settimeout(None)
+        return sock
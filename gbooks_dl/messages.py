@@ -17,5 +17,37 @@ def write_max_dl_pages(pg):
     log_out(f"Got {pg} pages to download\n")
 
 
+def write_duplicate_dl_pages(n):
+    if n:
+        log_out(f"{n} more page(s) share a source with another page and will be linked to it\n")
+
+
+def _of_max(pg, _max):
+    # The number of pages isn't known while they are still being found
+    return f"{pg}/{_max}" if _max is not None else f"{pg}"
+
+
 def write_current_dl_page(pg, _max):
-    log_out(f"Downloading page {pg}/{_max}\n")
+    log_out(f"Downloading page {_of_max(pg, _max)}\n")
+
+
+def write_skipped_dl_page(pg, _max):
+    log_out(f"Skipping page {_of_max(pg, _max)} (already downloaded)\n")
+
+
+def write_deferred_dl_page(pg, _max, exc):
+    log_err(f"Page {_of_max(pg, _max)} failed ({exc}), will retry it later\n")
+
+
+def write_failed_dl_page(pg, _max, exc):
+    log_err(f"Page {_of_max(pg, _max)} failed ({exc}), giving up on it\n")
+
+
+def write_batch_results(results):
+    failed = [r for r in results if r.error is not None]
+    log_out(f"\nDownloaded {len(results) - len(failed)}/{len(results)} books\n")
+    for result in results:
+        if result.error is None:
+            log_out(f"  OK      {result.url}\n")
+        else:
+            log_err(f"  FAILED  {result.url}: {type(result.error).__name__}: {result.error}\n")
@@ -0,0 +1,233 @@
+import struct
+from pathlib import Path
+from typing import NamedTuple, Optional, BinaryIO
+
+from gbooks_dl.logging import log_err
+from gbooks_dl.utils import STREAM_CHUNK_SIZE
+from gbooks_dl.exceptions import UnsupportedImageException
+from gbooks_dl.output.writer import PageWriter
+
+# Images carry no reliable resolution, so pages are sized as if they had this one.
+DEFAULT_DPI = 96
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# JPEG start-of-frame markers, which hold the image's size (all but DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# JPEG markers with no length or payload
+_JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+
+_JPEG_COLOR_SPACES = {1: '/DeviceGray', 3: '/DeviceRGB', 4: '/DeviceCMYK'}
+
+
+class _ImageData(NamedTuple):
+    """
+    What's needed to embed an image in a PDF as it is: its image dictionary
+    entries, and the (offset, length) ranges of the file making up its data.
+    """
+    width: int
+    height: int
+    entries: str
+    ranges: list[tuple[int, int]]
+
+    @property
+    def length(self) -> int:
+        return sum(length for _, length in self.ranges)
+
+
+def _read_jpeg(f: BinaryIO) -> _ImageData:
+    """
+    A JPEG file is a valid DCTDecode stream, so it is embedded whole.
+    Only its headers are read, to find its size and number of components.
+    """
+    size = f.seek(0, 2)
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        if not byte:
+            raise UnsupportedImageException('no frame header in JPEG')
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            marker = f.read(1)
+        if not marker:
+            raise UnsupportedImageException('no frame header in JPEG')
+        marker = marker[0]
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        (length,) = struct.unpack('>H', f.read(2))
+        if marker in _JPEG_SOF_MARKERS:
+            bits, height, width, components = struct.unpack('>BHHB', f.read(6))
+            break
+        f.seek(length - 2, 1)
+
+    color_space = _JPEG_COLOR_SPACES.get(components)
+    if color_space is None:
+        raise UnsupportedImageException(f'JPEG with {components} components')
+    entries = f'/ColorSpace {color_space} /BitsPerComponent {bits} /Filter /DCTDecode'
+    return _ImageData(width, height, entries, [(0, size)])
+
+
+def _read_png(f: BinaryIO) -> _ImageData:
+    """
+    The IDAT data of a PNG file is a valid FlateDecode stream with PNG
+    predictors, so it is embedded as it is, provided it has no alpha channel
+    and isn't interlaced. Only the chunk headers, and the palette, are read.
+    """
+    f.seek(len(_PNG_SIGNATURE))
+    header = None
+    palette = None
+    ranges = []
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            break
+        length, kind = struct.unpack('>I4s', chunk_header)
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', f.read(13))
+            f.seek(length - 13 + 4, 1)
+        elif kind == b'PLTE':
+            palette = f.read(length)
+            f.seek(4, 1)
+        elif kind == b'IDAT':
+            ranges.append((f.tell(), length))
+            f.seek(length + 4, 1)
+        elif kind == b'IEND':
+            break
+        else:
+            f.seek(length + 4, 1)
+
+    if header is None or not ranges:
+        raise UnsupportedImageException('PNG without a header or data')
+    width, height, bits, color_type, _, _, interlace = header
+    if interlace:
+        raise UnsupportedImageException('interlaced PNG')
+    if color_type == 0:
+        color_space, colors = '/DeviceGray', 1
+    elif color_type == 2:
+        color_space, colors = '/DeviceRGB', 3
+    elif color_type == 3 and palette is not None:
+        color_space, colors = f'[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]', 1
+    else:
+        raise UnsupportedImageException(f'PNG of color type {color_type}')
+
+    entries = (
+        f'/ColorSpace {color_space} /BitsPerComponent {bits} /Filter /FlateDecode '
+        f'/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent {bits} /Columns {width} >>'
+    )
+    return _ImageData(width, height, entries, ranges)
+
+
+def _read_image(f: BinaryIO) -> _ImageData:
+    magic = f.read(len(_PNG_SIGNATURE))
+    if magic.startswith(b'\xff\xd8'):
+        image = _read_jpeg(f)
+    elif magic == _PNG_SIGNATURE:
+        image = _read_png(f)
+    else:
+        raise UnsupportedImageException('not a JPEG or PNG image')
+
+    # Check the image is all there before any of it is written
+    size = f.seek(0, 2)
+    if any(offset + length > size for offset, length in image.ranges):
+        raise UnsupportedImageException('image ends early')
+    return image
+
+
+class PdfPageWriter(PageWriter):
+    """
+    Writes pages into a PDF, one image per page, with each page sized to fit its image.
+
+    Images are copied into the PDF as they are, without being decoded or
+    re-encoded. Each page is written out in full as soon as it is added, so
+    only the position of each object is kept until the cross-reference table
+    is written at the end.
+    """
+    extension = '.pdf'
+
+    # Objects 1 and 2 are the catalog and the page tree, written last.
+    _CATALOG = 1
+    _PAGE_TREE = 2
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._out: Optional[BinaryIO] = None
+        self._offsets: dict[int, int] = {}
+        self._last_obj = self._PAGE_TREE
+        self._pages: list[int] = []
+
+    def _open(self, path: Path) -> None:
+        self._out = open(path, 'wb')
+        self._offsets = {}
+        self._last_obj = self._PAGE_TREE
+        self._pages = []
+        self._out.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _write_page(self, index: int, key: str, fp: Path) -> None:
+        with open(fp, 'rb') as f:
+            try:
+                image = _read_image(f)
+            except (UnsupportedImageException, struct.error) as exc:
+                log_err(f"Leaving page {key} out of the PDF: {exc}\n")
+                return
+
+            image_obj = self._next_obj()
+            self._begin_obj(image_obj)
+            self._write(
+                f'<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} '
+                f'{image.entries} /Length {image.length} >>\nstream\n'
+            )
+            for offset, length in image.ranges:
+                self._copy(f, offset, length)
+            self._write('\nendstream\nendobj\n')
+
+        width = image.width * 72 / DEFAULT_DPI
+        height = image.height * 72 / DEFAULT_DPI
+        content = f'q {width:.2f} 0 0 {height:.2f} 0 0 cm /Im0 Do Q'
+        content_obj = self._next_obj()
+        self._begin_obj(content_obj)
+        self._write(f'<< /Length {len(content)} >>\nstream\n{content}\nendstream\nendobj\n')
+
+        page_obj = self._next_obj()
+        self._begin_obj(page_obj)
+        self._write(
+            f'<< /Type /Page /Parent {self._PAGE_TREE} 0 R /MediaBox [0 0 {width:.2f} {height:.2f}] '
+            f'/Resources << /XObject << /Im0 {image_obj} 0 R >> >> /Contents {content_obj} 0 R >>\nendobj\n'
+        )
+        self._pages.append(page_obj)
+
+    def _close(self) -> None:
+        if self._out is None:
+            return
+        self._begin_obj(self._PAGE_TREE)
+        kids = ' '.join(f'{obj} 0 R' for obj in self._pages)
+        self._write(f'<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>\nendobj\n')
+        self._begin_obj(self._CATALOG)
+        self._write(f'<< /Type /Catalog /Pages {self._PAGE_TREE} 0 R >>\nendobj\n')
+
+        xref_offset = self._out.tell()
+        size = self._last_obj + 1
+        self._write(f'xref\n0 {size}\n0000000000 65535 f \n')
+        for obj in range(1, size):
+            self._write(f'{self._offsets[obj]:010d} 00000 n \n')
+        self._write(f'trailer\n<< /Size {size} /Root {self._CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n')
+        self._out.close()
+        self._out = None
+
+    def _next_obj(self) -> int:
+        self._last_obj += 1
+        return self._last_obj
+
+    def _begin_obj(self, obj: int) -> None:
+        self._offsets[obj] = self._out.tell()
+        self._write(f'{obj} 0 obj\n')
+
+    def _write(self, s: str) -> None:
+        self._out.write(s.encode('latin-1'))
+
+    def _copy(self, f: BinaryIO, offset: int, length: int) -> None:
+        f.seek(offset)
+        while length > 0 and (chunk := f.read(min(length, STREAM_CHUNK_SIZE))):
+            self._out.write(chunk)
+            length -= len(chunk)
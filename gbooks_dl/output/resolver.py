@@ -0,0 +1,36 @@
+import os
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from gbooks_dl.output.writer import PageWriter
+
+FOLDER_FORMAT = 'folder'
+
+OUTPUT_FORMATS = (
+    FOLDER_FORMAT,
+    'cbz',
+    'zip',
+    'pdf',
+)
+
+
+def get_page_writer(output_format: str, dest: os.PathLike | str, name: str) -> Optional['PageWriter']:
+    """
+    Returns a writer of the book `name` into a file in `dest`, or None if the
+    pages are to be left in a folder.
+
+    The writers are only imported here, so the command line can list
+    `OUTPUT_FORMATS` without importing them.
+    """
+    from gbooks_dl.output.zip import ZipPageWriter, CbzPageWriter
+    from gbooks_dl.output.pdf import PdfPageWriter
+
+    writer = {
+        'cbz': CbzPageWriter,
+        'zip': ZipPageWriter,
+        'pdf': PdfPageWriter,
+    }.get(output_format)
+
+    if writer is not None:
+        return writer(os.path.join(dest, name + writer.extension))
+    return writer
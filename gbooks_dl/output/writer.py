@@ -0,0 +1,107 @@
+"""
+Writing a book's pages into a single file, e.g. an archive, instead of
+leaving one file per page in the output folder.
+"""
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+from abc import ABC, abstractmethod
+
+
+class PageWriter(ABC):
+    """
+    Writes pages into the file at `path` in page order, as they are finished.
+
+    Pages may be finished in any order, and before the order of the book's
+    pages is even known, so each one is held back, as a file on disk, until
+    the order has been set and every page before it has been finished too.
+    At no point is more than one page read into memory.
+
+    The file is built next to `path` and only moved into place by `close()`.
+    The pages' files are downloaded into `work_dir`, a hidden folder next to
+    it, along with the manifest of the download. It is only removed once
+    every page has been written, so a download which was interrupted, or
+    had pages missing, picks up where it left off when it is run again. The
+    checksums of the pages' files are kept next to the file, in `checksums_path`.
+    """
+    extension: str
+
+    def __init__(self, path: os.PathLike | str):
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(f'{self.path.name}.part')
+        self.work_dir = self.path.with_name(f'.{self.path.name}.pages')
+        self.checksums_path = self.path.with_name(f'{self.path.name}.SHA256SUMS')
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self._order: Optional[list[str]] = None
+        self._next = 0
+        self._finished: dict[str, Optional[Path]] = {}
+
+    def open(self) -> None:
+        self._order = None
+        self._next = 0
+        self._finished.clear()
+        self._open(self._tmp_path)
+
+    def set_order(self, page_keys: list[str]) -> None:
+        """
+        `page_keys` are the keys of every page of the book, in page order.
+        Nothing is written until they are known.
+        """
+        self._order = page_keys
+        self._write_finished()
+
+    def add_page(self, page_keys: list[str], fp: Optional[Path]) -> None:
+        """
+        Marks the pages with the given keys as finished. They all share the file
+        `fp`, or None if they couldn't be downloaded and are to be left out.
+        """
+        for key in page_keys:
+            self._finished[key] = fp
+        self._write_finished()
+
+    def close(self, complete: bool = True) -> None:
+        """
+        Writes whatever pages are finished, leaving out those which never were,
+        and moves the completed file into place. Unless the download was
+        `complete`, `work_dir` is kept, so it can be resumed.
+        """
+        self._write_finished(skip_missing=True)
+        self._close()
+        os.replace(self._tmp_path, self.path)
+        if complete:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def abort(self) -> None:
+        """
+        Abandons the file, but keeps `work_dir`, so the download can be resumed.
+        """
+        self._close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _write_finished(self, skip_missing: bool = False) -> None:
+        if self._order is None:
+            return
+        while self._next < len(self._order):
+            key = self._order[self._next]
+            if key not in self._finished and not skip_missing:
+                break
+            fp = self._finished.pop(key, None)
+            if fp is not None:
+                self._write_page(self._next, key, fp)
+            self._next += 1
+
+    @abstractmethod
+    def _open(self, path: Path) -> None:
+        ...
+
+    @abstractmethod
+    def _write_page(self, index: int, key: str, fp: Path) -> None:
+        """
+        Write the page at position `index` in the book, whose image is in `fp`.
+        """
+        ...
+
+    @abstractmethod
+    def _close(self) -> None:
+        ...
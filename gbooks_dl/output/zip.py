@@ -0,0 +1,51 @@
+import time
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+from gbooks_dl.utils import STREAM_CHUNK_SIZE
+from gbooks_dl.output.writer import PageWriter
+
+
+class ZipPageWriter(PageWriter):
+    """
+    Writes pages into a ZIP archive, one entry per page.
+
+    Entries are stored rather than deflated, since the images are already
+    compressed, and are named with their position in the book first, so
+    readers which sort entries by name show them in order.
+    """
+    extension = '.zip'
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._zip: Optional[zipfile.ZipFile] = None
+
+    def _open(self, path: Path) -> None:
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True)
+
+    def _write_page(self, index: int, key: str, fp: Path) -> None:
+        width = len(str(len(self._order)))
+        stat = fp.stat()
+        info = zipfile.ZipInfo(
+            f'{index + 1:0{width}d}_{key}{fp.suffix}',
+            date_time=time.localtime(stat.st_mtime)[:6]
+        )
+        info.compress_type = zipfile.ZIP_STORED
+        # Knowing the size up front lets zipfile decide whether the entry needs ZIP64
+        info.file_size = stat.st_size
+        with open(fp, 'rb') as src, self._zip.open(info, 'w') as dst:
+            shutil.copyfileobj(src, dst, STREAM_CHUNK_SIZE)
+
+    def _close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class CbzPageWriter(ZipPageWriter):
+    """
+    A comic book archive, which is a ZIP archive of the pages in order.
+    """
+    extension = '.cbz'
@@ -1,15 +1,158 @@
 import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
 
 from gbooks_dl.logging import log_out
 from gbooks_dl.parser import get_provider_name
+from gbooks_dl.cache import LookupCache
+from gbooks_dl.store import ContentStore
+from gbooks_dl.output.writer import PageWriter
+from gbooks_dl.output.resolver import get_page_writer, FOLDER_FORMAT
+from gbooks_dl.session import Session
+from gbooks_dl.cookiejar import CookieJar
+from gbooks_dl.transport import BaseTransport, new_transport
+from gbooks_dl.retry import RetryPolicy
+from gbooks_dl.ratelimit import AdaptiveRateLimiter
+from gbooks_dl.books.base.book import Book
 from gbooks_dl.books.providers.resolver import get_provider_book
 from gbooks_dl.exceptions import (
     NoRegisteredProviderException,
     CouldNotParseProviderException
 )
 
+if TYPE_CHECKING:
+    from gbooks_dl.aio.client import AsyncClient
 
-def pipeline(url: str, dest: os.PathLike | str):
+
+def pipeline(
+        url: str,
+        dest: os.PathLike | str,
+        jobs: int = 1,
+        transport: Optional[BaseTransport] = None,
+        prefetch: bool = False,
+        cache: Optional[LookupCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        store: Optional[ContentStore] = None,
+        output_format: str = FOLDER_FORMAT,
+        cookie_jar: Optional[CookieJar] = None,
+        http2: bool = False,
+        timeout: Optional[float] = None
+):
+    """
+    Find and download every available page of the book at `url` into a
+    folder of its own in `dest`, named after its ID.
+
+    The lookups and the page downloads share one pool of keep-alive connections.
+    Pass `transport` to share it beyond this book; otherwise one is created
+    with room for `jobs` connections and closed afterwards. With `http2`, it
+    is an HTTP/2 transport, if h2 is installed. Requests which stall for
+    `timeout` seconds fail, and are retried like any other dropped request.
+
+    With a `cookie_jar`, the book's session starts with the cookies kept in it,
+    and its cookies are saved back to it once the book is done, or has failed.
+    """
+    if transport is None:
+        with new_transport(pool_size=jobs, rate_limiter=rate_limiter, http2=http2, timeout=timeout) as transport:
+            return pipeline(url, dest, jobs, transport, prefetch, cache, retry_policy=retry_policy,
+                            store=store, output_format=output_format, cookie_jar=cookie_jar)
+
+    book = _get_book(url, transport, prefetch=prefetch, cache=cache, retry_policy=retry_policy,
+                     cookie_jar=cookie_jar)
+
+    # Now let's look for the source URL of each available page in the book,
+    # and download each page as soon as its source is found.
+    pages_dest, page_writer = _get_output(dest, book, output_format)
+    downloader = book.downloader(
+        pages_dest,
+        book.session,
+        jobs=jobs,
+        retry_policy=retry_policy,
+        store=store,
+        page_writer=page_writer,
+        book_id=book.id
+    )
+    try:
+        downloader.download_pages(book.iter_pages())
+    finally:
+        book.session.save_cookies()
+
+
+async def async_pipeline(
+        url: str,
+        dest: os.PathLike | str,
+        jobs: int = 1,
+        client: Optional['AsyncClient'] = None,
+        prefetch: bool = False,
+        cache: Optional[LookupCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        store: Optional[ContentStore] = None,
+        output_format: str = FOLDER_FORMAT,
+        cookie_jar: Optional[CookieJar] = None,
+        timeout: Optional[float] = None
+):
+    """
+    The same as `pipeline()`, but every request is made on the running event loop.
+
+    `jobs` is the number of requests allowed in flight at once. Pass a shared
+    `client` to run several books concurrently under one limit instead;
+    otherwise one is created and closed afterwards. Every request goes through
+    the client, so there is no `transport` to pass, and the book's session
+    never creates one.
+    """
+    if client is None:
+        from gbooks_dl.aio.client import AsyncClient
+        with AsyncClient(limit=jobs, rate_limiter=rate_limiter, timeout=timeout) as client:
+            return await async_pipeline(url, dest, jobs, client, prefetch, cache, retry_policy=retry_policy,
+                                        store=store, output_format=output_format, cookie_jar=cookie_jar)
+
+    book = _get_book(url, prefetch=prefetch, cache=cache, retry_policy=retry_policy, cookie_jar=cookie_jar)
+
+    pages_dest, page_writer = _get_output(dest, book, output_format)
+    downloader = book.downloader(
+        pages_dest,
+        book.session,
+        jobs=jobs,
+        retry_policy=retry_policy,
+        store=store,
+        page_writer=page_writer,
+        book_id=book.id
+    )
+    try:
+        await downloader.download_pages_async(book.iter_pages_async(client), client)
+    finally:
+        book.session.save_cookies()
+
+
+def _get_output(
+        dest: os.PathLike | str,
+        book: Book,
+        output_format: str
+) -> tuple[Path, Optional[PageWriter]]:
+    """
+    Returns the folder to download the pages of `book` into, and the writer of
+    the file they are to end up in, if any. A book whose pages are left in a
+    folder gets a folder of its own inside `dest`, named after its ID, so
+    books downloaded into the same `dest` never share one.
+    """
+    page_writer = get_page_writer(output_format, dest, book.id)
+    if page_writer is not None:
+        return page_writer.work_dir, page_writer
+    pages_dest = Path(dest, book.id)
+    pages_dest.mkdir(parents=True, exist_ok=True)
+    return pages_dest, None
+
+
+def _get_book(
+        url: str,
+        transport: Optional[BaseTransport] = None,
+        prefetch: bool = False,
+        cache: Optional[LookupCache] = None,
+        session: Optional[Session] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        cookie_jar: Optional[CookieJar] = None
+) -> Book:
     # Start by parsing the second level domain of the URL to get the provider
     provider = get_provider_name(url)
     if provider is None:
@@ -22,15 +165,18 @@ def pipeline(url: str, dest: os.PathLike | str):
     log_out(f'Extracted provider from URL: {provider}\n')
 
     # Now attempt to get a Book instance for the parsed provider
-    book = get_provider_book(provider, url)
+    book = get_provider_book(
+        provider,
+        url,
+        transport=transport,
+        prefetch=prefetch,
+        cache=cache,
+        session=session,
+        retry_policy=retry_policy,
+        cookie_jar=cookie_jar
+    )
     if book is None:
         raise NoRegisteredProviderException(
             f"There is no provider registered for provider '{provider}'."
         )
-
-    # Now let's get the source URL of each available page in the book.
-    pages = book.get_pages()
-
-    # Once we have the pages, download them.
-    downloader = book.downloader(dest, book.cookie)
-    downloader.download_pages(pages)
+    return book
@@ -0,0 +1,122 @@
+"""
+Adaptive control of the rate at which requests are sent.
+
+Providers throttle clients which send requests too quickly, and the rate
+they will tolerate isn't published. Rather than guessing a fixed delay,
+`AdaptiveRateLimiter` probes for it: the allowed rate grows steadily while
+responses are healthy and is cut sharply whenever the server pushes back
+(additive increase, multiplicative decrease).
+"""
+import time
+import threading
+import email.utils
+from typing import Optional
+
+from gbooks_dl.stats import run_stats
+
+THROTTLED_STATUSES = {429, 503}
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate (in requests per second) adapts to the
+    responses it is told about.
+
+    Every healthy response raises the rate by roughly `increase` requests per
+    second for each second of requests sent at the current rate. A throttled
+    response multiplies the rate by `decrease`, empties the bucket and, if the
+    response has a Retry-After header, holds every request back until then.
+
+    A single instance is safe to share between threads and should be shared by
+    everything that sends requests to the same provider.
+    """
+    def __init__(
+            self,
+            rate: float = 10.0,
+            min_rate: float = 0.2,
+            max_rate: float = 50.0,
+            increase: float = 1.0,
+            decrease: float = 0.5,
+            burst: Optional[float] = None
+    ):
+        self._min_rate = min_rate
+        self._max_rate = max(max_rate, min_rate)
+        self._rate = min(max(rate, self._min_rate), self._max_rate)
+        self._increase = increase
+        self._decrease = decrease
+        self._burst = burst
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @property
+    def _capacity(self) -> float:
+        return self._burst if self._burst is not None else max(1.0, self._rate)
+
+    def reserve(self) -> float:
+        """
+        Takes a token for one request, and returns how many seconds the
+        request must wait before being sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request may be sent.
+        """
+        wait = self.reserve()
+        if wait > 0:
+            run_stats.add_wait(wait)
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        import asyncio
+        wait = self.reserve()
+        if wait > 0:
+            run_stats.add_wait(wait)
+            await asyncio.sleep(wait)
+
+    def on_response(self, status: int, retry_after: Optional[str] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if status in THROTTLED_STATUSES:
+                self._rate = max(self._min_rate, self._rate * self._decrease)
+                self._tokens = min(self._tokens, 0.0)
+                delay = parse_retry_after(retry_after)
+                if delay is not None:
+                    self._paused_until = max(self._paused_until, now + delay)
+            elif status < 400:
+                self._rate = min(self._max_rate, self._rate + self._increase / self._rate)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Returns the number of seconds a Retry-After header value asks us to wait.
+    It may be given either as a number of seconds or as an HTTP date.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -0,0 +1,85 @@
+"""
+Retrying requests which failed for reasons that are likely to be temporary.
+"""
+import time
+import random
+import socket
+import http.client
+import urllib.error
+from typing import Callable, TypeVar, Awaitable
+
+from gbooks_dl.stats import run_stats
+
+# Throttled requests (429, 503) aren't among them, as the transport already
+# sends them again once the rate limiter allows
+RETRYABLE_STATUSES = {408, 500, 502, 504}
+
+T = TypeVar('T')
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request should be tried again, and how long to
+    wait before doing so.
+
+    Waits follow exponential backoff with full jitter: before the n-th retry,
+    a random time between zero and `backoff_base * 2 ** (n - 1)` seconds is
+    waited, capped at `backoff_cap`. A request is made at most `max_attempts`
+    times in total.
+    """
+    def __init__(self, max_attempts: int = 4, backoff_base: float = 0.5, backoff_cap: float = 30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def backoff(self, retry: int) -> float:
+        """
+        Returns how long to wait before the `retry`-th retry (counting from 1).
+        """
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** (retry - 1)))
+
+    @staticmethod
+    def is_retryable(exc: BaseException) -> bool:
+        if isinstance(exc, urllib.error.HTTPError):
+            return exc.code in RETRYABLE_STATUSES
+        return isinstance(exc, (
+            ConnectionError,
+            TimeoutError,
+            socket.timeout,
+            http.client.HTTPException,
+        ))
+
+    def call(self, func: Callable[..., T], *args, attempts_made: int = 0) -> T:
+        """
+        Calls `func` until it succeeds, raises an error that isn't retryable, or
+        has been attempted `max_attempts` times (including `attempts_made`
+        earlier attempts). The last error is raised if all attempts fail.
+        """
+        attempt = attempts_made
+        while True:
+            if attempt > 0:
+                run_stats.count('retries')
+                time.sleep(self.backoff(attempt))
+            attempt += 1
+            try:
+                return func(*args)
+            except Exception as exc:
+                if attempt >= self.max_attempts or not self.is_retryable(exc):
+                    raise
+
+    async def call_async(self, func: Callable[..., Awaitable[T]], *args, attempts_made: int = 0) -> T:
+        """
+        Asynchronous counterpart of `call()`.
+        """
+        import asyncio
+        attempt = attempts_made
+        while True:
+            if attempt > 0:
+                run_stats.count('retries')
+                await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+            try:
+                return await func(*args)
+            except Exception as exc:
+                if attempt >= self.max_attempts or not self.is_retryable(exc):
+                    raise
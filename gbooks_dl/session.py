@@ -0,0 +1,148 @@
+"""
+The state shared by every request made to a provider.
+
+A session holds the transport requests are sent through, the headers each
+kind of request is sent with and the cookies the provider has handed out. A
+book's crawl and its downloader share one session, as do the books of a
+batch, so the cookies picked up by any request are sent with every request
+after it, and the headers are only worked out once.
+"""
+import time
+import threading
+from typing import Type, Optional
+from http.cookies import SimpleCookie
+
+from gbooks_dl.transport import BaseTransport, Transport
+from gbooks_dl.useragent import random_user_agent
+from gbooks_dl.cookiejar import CookieJar, StoredCookie, cookie_expiry
+from gbooks_dl.books.base.headers import Headers, HeadersKind, RequestHeadersFactory
+
+
+class Session:
+    """
+    Safe to share between any number of threads, or coroutines.
+
+    Providers subclass it to set the factory their headers come from and the
+    class of their cookie jar, and the name their cookies are kept under in a
+    `CookieJar`.
+    """
+    name: str = 'default'
+    headers_factory: Type[RequestHeadersFactory]
+    cookie_class: Type[SimpleCookie] = SimpleCookie
+
+    def __init__(self, transport: Optional[BaseTransport] = None, cookie_jar: Optional[CookieJar] = None):
+        """
+        If a `cookie_jar` is given, the session starts with the cookies kept in
+        it, and `save_cookies()` saves the session's cookies back to it.
+
+        `transport` is what requests are sent through by threaded runs. Unless
+        one is given, a `Transport` is only created once it is first needed,
+        so async runs, which send every request through their `AsyncClient`,
+        never create one.
+        """
+        self._transport = transport
+        # One user agent for the whole session, as a browser would have
+        self.user_agent = random_user_agent()
+        self._templates: dict[Optional[HeadersKind], Headers] = {}
+        self._cookies = self.cookie_class()
+        # When each cookie expires and was last set, including cookies which
+        # have been deleted, so a cookie jar can drop its copies of them
+        self._stored: dict[str, StoredCookie] = {}
+        self._next_expiry: Optional[float] = None
+        self._cookie_header: Optional[str] = None
+        self._lock = threading.Lock()
+        self._cookie_jar = cookie_jar
+        if cookie_jar is not None:
+            self._load_cookies(cookie_jar.load(self.name))
+
+    @property
+    def transport(self) -> BaseTransport:
+        with self._lock:
+            if self._transport is None:
+                self._transport = Transport()
+            return self._transport
+
+    def headers(self, kind: Optional[HeadersKind] = None) -> Headers:
+        """
+        A copy of the headers for `kind` of request, with the current cookies.
+        """
+        with self._lock:
+            template = self._templates.get(kind)
+            if template is None:
+                template = self._templates[kind] = self.headers_factory.get_headers(
+                    kind=kind,
+                    user_agent=self.user_agent
+                )
+            headers = dict(template)
+            if self._next_expiry is not None and time.time() >= self._next_expiry:
+                self._expire_cookies()
+            if self._cookie_header is not None:
+                headers['cookie'] = self._cookie_header
+        return headers
+
+    def update_cookies(self, res) -> None:
+        """
+        Merges the cookies set by the response `res` into the session's, so a
+        response setting one cookie leaves the others as they were. A cookie
+        set to expire in the past is removed.
+        """
+        set_cookies = [v for k, v in res.info().items() if k.lower() == 'set-cookie']
+        if not set_cookies:
+            return
+        now = time.time()
+        with self._lock:
+            for set_cookie in set_cookies:
+                name_value, *attributes = set_cookie.split(';')
+                name = name_value.partition('=')[0].strip()
+                self._cookies.load(name_value)
+                morsel = self._cookies.get(name)
+                if morsel is None:
+                    continue
+                self._stored[name] = StoredCookie(name, morsel.coded_value, cookie_expiry(attributes, now), now)
+            self._expire_cookies(now)
+
+    def save_cookies(self) -> None:
+        """
+        Saves the session's cookies to its cookie jar, if it has one.
+        """
+        if self._cookie_jar is None:
+            return
+        with self._lock:
+            cookies = list(self._stored.values())
+        self._cookie_jar.save(self.name, cookies)
+
+    @property
+    def cookie(self) -> Optional[str]:
+        """
+        The value of the Cookie header requests are sent with, if any.
+        """
+        return self._cookie_header
+
+    def _load_cookies(self, cookies: list[StoredCookie]) -> None:
+        for cookie in cookies:
+            self._cookies.load(f'{cookie.name}={cookie.value}')
+            if cookie.name in self._cookies:
+                self._stored[cookie.name] = cookie
+        self._expire_cookies()
+
+    def _expire_cookies(self, now: Optional[float] = None) -> None:
+        """
+        Drops the cookies which have expired by `now`, and works out the
+        Cookie header and when the next cookie expires.
+        """
+        if now is None:
+            now = time.time()
+        self._next_expiry = None
+        for name, cookie in self._stored.items():
+            if cookie.expires is None:
+                continue
+            if cookie.expires <= now:
+                self._cookies.pop(name, None)
+            elif self._next_expiry is None or cookie.expires < self._next_expiry:
+                self._next_expiry = cookie.expires
+        self._cookie_header = self._output_cookies()
+
+    def _output_cookies(self) -> Optional[str]:
+        if not self._cookies:
+            return None
+        return '; '.join(f'{name}={morsel.coded_value}' for name, morsel in self._cookies.items())
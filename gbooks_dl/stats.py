@@ -0,0 +1,228 @@
+"""
+Instrumentation of a run, for finding out where its time goes.
+
+The lookup loop, the downloaders, the retry policy and the rate limiter report
+what they do to `run_stats`, which can be turned into a machine-readable
+report once the run is over, e.g. with `gbooks-dl --stats-json FILE`.
+"""
+import sys
+import json
+import math
+import time
+import threading
+import contextlib
+import contextvars
+from typing import BinaryIO, Iterator, Iterable, AsyncIterable, AsyncIterator, TypeVar, Optional
+
+T = TypeVar('T')
+
+PERCENTILES = (50, 95, 99)
+
+# The time waited so far by the request being timed in the current thread or task
+_request_wait: contextvars.ContextVar[Optional[list[float]]] = contextvars.ContextVar('_request_wait', default=None)
+
+
+class LatencyHistogram:
+    """
+    Keeps every sample, so percentiles are exact. A run makes at most a few
+    thousand requests, so this is cheap.
+    """
+    def __init__(self):
+        self._samples: list[float] = []
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def summary(self) -> dict:
+        samples = sorted(self._samples)
+        summary = {'count': len(samples)}
+        if samples:
+            summary['mean'] = sum(samples) / len(samples)
+            for p in PERCENTILES:
+                summary[f'p{p}'] = _percentile(samples, p)
+            summary['max'] = samples[-1]
+        return summary
+
+
+def _percentile(samples: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile of the sorted `samples`.
+    """
+    return samples[max(0, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+class _TimedWriter:
+    """
+    Wraps a file, adding the time spent in its `write()` to the run's disk time.
+    """
+    def __init__(self, out: BinaryIO, stats: 'RunStats'):
+        self._out = out
+        self._stats = stats
+
+    def write(self, data) -> int:
+        start = time.perf_counter()
+        try:
+            return self._out.write(data)
+        finally:
+            self._stats.add_time('disk', time.perf_counter() - start)
+
+
+class RunStats:
+    """
+    Thread-safe counters, timers and latency histograms for one run.
+
+    Times are summed over every thread, so with several download workers the
+    disk time can exceed the time the run actually took.
+    """
+    COUNTERS = (
+        'lookup_requests',
+        'lookups_cached',
+        'image_requests',
+        'pages_discovered',
+        'pages_downloaded',
+        'pages_skipped',
+        'placeholders_rejected',
+        'placeholders_rejected_early',
+        'retries',
+        'bytes_received',
+        'bytes_decoded',
+    )
+    TIMERS = ('crawl', 'download', 'disk', 'wait')
+    LATENCIES = ('lookup', 'image')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters = dict.fromkeys(self.COUNTERS, 0)
+            self.times = dict.fromkeys(self.TIMERS, 0.0)
+            self.latencies = {kind: LatencyHistogram() for kind in self.LATENCIES}
+            self._started = time.perf_counter()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def add_time(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.times[name] += seconds
+
+    def add_bytes(self, received: int, decoded: int) -> None:
+        """
+        Records a response body's size on the wire and after decompression.
+        """
+        with self._lock:
+            self.counters['bytes_received'] += received
+            self.counters['bytes_decoded'] += decoded
+
+    @contextlib.contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_wait(self, seconds: float) -> None:
+        """
+        Records time a request spent waiting for its turn to be sent, e.g. on
+        the rate limiter, which is left out of the request's latency.
+        """
+        self.add_time('wait', seconds)
+        wait = _request_wait.get()
+        if wait is not None:
+            wait[0] += seconds
+
+    @contextlib.contextmanager
+    def request(self, kind: str) -> Iterator[None]:
+        """
+        Counts a `kind` request, and records its latency if it succeeds.
+        """
+        self.count(f'{kind}_requests')
+        wait = [0.0]
+        token = _request_wait.set(wait)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _request_wait.reset(token)
+        elapsed = time.perf_counter() - start - wait[0]
+        with self._lock:
+            self.latencies[kind].observe(elapsed)
+
+    def timed_iter(self, name: str, it: Iterable[T]) -> Iterator[T]:
+        """
+        Yields the items of `it`, adding the time spent waiting on each one to
+        the `name` timer, e.g. to time a crawl whose pages are consumed as
+        they are found.
+        """
+        it = iter(it)
+        while True:
+            with self.timer(name):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+
+    async def timed_aiter(self, name: str, it: AsyncIterable[T]) -> AsyncIterator[T]:
+        """
+        Asynchronous counterpart of `timed_iter()`.
+        """
+        it = aiter(it)
+        while True:
+            with self.timer(name):
+                try:
+                    item = await anext(it)
+                except StopAsyncIteration:
+                    return
+            yield item
+
+    def timed_writer(self, out: BinaryIO) -> BinaryIO:
+        return _TimedWriter(out, self)
+
+    def report(self) -> dict:
+        with self._lock:
+            c = dict(self.counters)
+            times = dict(self.times)
+            latencies = {kind: hist.summary() for kind, hist in self.latencies.items()}
+            elapsed = time.perf_counter() - self._started
+        return {
+            'elapsed': elapsed,
+            'lookups': {
+                'requests': c['lookup_requests'],
+                'cached': c['lookups_cached'],
+                'pages_discovered': c['pages_discovered'],
+                'requests_per_page': c['lookup_requests'] / c['pages_discovered'] if c['pages_discovered'] else None,
+            },
+            'pages': {
+                'requests': c['image_requests'],
+                'downloaded': c['pages_downloaded'],
+                'skipped': c['pages_skipped'],
+                'placeholders_rejected': c['placeholders_rejected'],
+                'placeholders_rejected_early': c['placeholders_rejected_early'],
+            },
+            'retries': c['retries'],
+            'latency': latencies,
+            'bytes': {
+                'received': c['bytes_received'],
+                'decoded': c['bytes_decoded'],
+            },
+            'time': times,
+        }
+
+    def write_json(self, path: str) -> None:
+        """
+        Writes the report to `path`, or to stdout if `path` is '-'.
+        """
+        report = json.dumps(self.report(), indent=2)
+        if path == '-':
+            sys.stdout.write(report + '\n')
+        else:
+            with open(path, 'w') as f:
+                f.write(report + '\n')
+
+
+run_stats = RunStats()
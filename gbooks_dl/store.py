@@ -0,0 +1,89 @@
+"""
+A content-addressed store for page images.
+
+Every image is stored once, under its sha256 digest, and the output folder of
+each book links to the images in the store instead of holding copies of them.
+Books which share pages (e.g. editions with the same front matter), and books
+downloaded again into a new folder, then take no extra space for those pages.
+"""
+import os
+import stat
+import uuid
+import shutil
+from pathlib import Path
+
+from gbooks_dl.utils import file_digest
+
+WRITE_PERMISSIONS = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+
+class ContentStore:
+    """
+    Images are kept in `root`, sharded into subfolders by the first two pairs
+    of hex digits of their digest, e.g. `root/4c/d2/4cd25d43...jpeg`.
+
+    The store is safe to share between threads, processes and books: objects
+    are only ever added by renaming a complete file into place. Objects are
+    made read-only, as the files linked to them share their data, so editing
+    one of those files in place would change the object too.
+    """
+    def __init__(self, root: os.PathLike | str):
+        self._root = Path(root)
+        self._tmp_dir = Path(root, 'tmp')
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def object_path(self, sha256: str, extension: str = '') -> Path:
+        return Path(self._root, sha256[:2], sha256[2:4], sha256 + extension)
+
+    def temp_path(self) -> Path:
+        """
+        A new path to download a file to before adding it. It is on the same
+        file system as the store, so adding the file is a cheap rename.
+        """
+        return Path(self._tmp_dir, f'{uuid.uuid4().hex}.part')
+
+    def add(self, fp: Path, sha256: str, extension: str = '') -> Path:
+        """
+        Moves the file at `fp`, whose digest is `sha256`, into the store, and
+        returns its path there. If the store already has it intact, `fp` is
+        removed, and if the store's copy has been changed, `fp` replaces it.
+        """
+        obj = self.object_path(sha256, extension)
+        if self._is_intact(obj, sha256, fp.stat().st_size):
+            fp.unlink(missing_ok=True)
+            return obj
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        if obj.exists():
+            # Windows won't replace a read-only file
+            obj.chmod(stat.S_IMODE(obj.stat().st_mode) | stat.S_IWUSR)
+        fp.chmod(stat.S_IMODE(fp.stat().st_mode) & ~WRITE_PERMISSIONS)
+        os.replace(fp, obj)
+        return obj
+
+    @staticmethod
+    def _is_intact(obj: Path, sha256: str, size: int) -> bool:
+        try:
+            if obj.stat().st_size != size:
+                return False
+        except FileNotFoundError:
+            return False
+        return file_digest(obj) == sha256
+
+
+def link_file(src: Path, dst: Path) -> None:
+    """
+    Makes `dst` refer to the same data as `src`, replacing it if it exists.
+
+    A hard link is preferred. Failing that, e.g. across file systems, a
+    symbolic link is made, and only failing both is the file copied.
+    """
+    tmp_dst = dst.with_name(f'{dst.name}.part')
+    tmp_dst.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp_dst)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(src), tmp_dst)
+        except OSError:
+            shutil.copyfile(src, tmp_dst)
+    os.replace(tmp_dst, dst)
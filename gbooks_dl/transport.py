@@ -0,0 +1,361 @@
+"""
+Persistent, thread-safe HTTP transports.
+
+`urllib.request.urlopen` opens (and TLS-handshakes) a new connection for every
+request. `Transport` instead keeps finished connections to each host in a pool,
+so consecutive lookups and page images can reuse them.
+
+Every transport implements `BaseTransport`. Besides the HTTP/1.1 `Transport`,
+there is an HTTP/2 one in `gbooks_dl.http2`, which is only available when the
+optional h2 package is installed. `new_transport()` picks between them.
+"""
+import io
+import time
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import importlib.util
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Optional
+
+from gbooks_dl.logging import log_err
+from gbooks_dl.exceptions import GBooksDlHttpException
+from gbooks_dl.ratelimit import AdaptiveRateLimiter, THROTTLED_STATUSES
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+MAX_THROTTLED_ATTEMPTS = 5
+
+# Errors that mean a pooled connection was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+_PoolKey = tuple[str, str, int]
+
+
+class PooledResponse:
+    """
+    Wraps an `http.client.HTTPResponse` and hands its connection back to the
+    pool once the body has been read to the end.
+
+    A response that is closed before being fully read can't be reused, so its
+    connection is closed instead.
+    """
+    def __init__(self, pool: 'ConnectionPool', key: _PoolKey,
+                 conn: http.client.HTTPConnection, res: http.client.HTTPResponse, url: str):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._res = res
+        self.url = url
+
+    @property
+    def status(self) -> int:
+        return self._res.status
+
+    @property
+    def reason(self) -> str:
+        return self._res.reason
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._res.msg
+
+    def info(self) -> http.client.HTTPMessage:
+        return self._res.msg
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self._res.getheader(name, default)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        data = self._res.read(amt)
+        self._release_if_done()
+        return data
+
+    def readinto(self, b) -> int:
+        n = self._res.readinto(b)
+        self._release_if_done()
+        return n
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        if self._res.isclosed():
+            self._release_if_done()
+        else:
+            self._res.close()
+            self._conn.close()
+            self._conn = None
+
+    def _release_if_done(self) -> None:
+        if self._conn is not None and self._res.isclosed():
+            if self._res.will_close:
+                self._conn.close()
+            else:
+                self._pool.release(self._key, self._conn)
+            self._conn = None
+
+    def __enter__(self) -> 'PooledResponse':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class BufferedResponse:
+    """
+    A response whose body has already been read in full.
+
+    It mimics the parts of `http.client.HTTPResponse` the rest of the project
+    relies on, and holds no connection.
+    """
+    def __init__(self, url: str, status: int, reason: str, headers: http.client.HTTPMessage, body: bytes):
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._body = io.BytesIO(body)
+
+    def info(self) -> http.client.HTTPMessage:
+        return self.headers
+
+    def getheader(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name, default)
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._body.read(amt)
+
+    def readinto(self, b) -> int:
+        return self._body.readinto(b)
+
+    def close(self) -> None:
+        ...
+
+    def __enter__(self) -> 'BufferedResponse':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Keeps up to `maxsize` idle connections per host.
+
+    Connections which have been idle for longer than `idle_timeout` seconds
+    are evicted rather than reused, as the server has most likely dropped them.
+    They are evicted whenever a connection is released, so connections to a
+    host which is no longer being requested don't stay open for the whole run.
+    """
+    def __init__(self, maxsize: int = 8, idle_timeout: float = 30.0, timeout: Optional[float] = None):
+        self._maxsize = max(1, maxsize)
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._idle: dict[_PoolKey, deque[tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: _PoolKey) -> tuple[http.client.HTTPConnection, bool]:
+        """
+        Returns a connection for `key`, and whether it was reused from the pool.
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key)
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used <= self._idle_timeout:
+                    return conn, True
+                conn.close()
+        return self.connect(key), False
+
+    def release(self, key: _PoolKey, conn: http.client.HTTPConnection) -> None:
+        self.evict_idle()
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self._maxsize:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def evict_idle(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for idle in self._idle.values():
+                fresh = [(c, t) for c, t in idle if now - t <= self._idle_timeout]
+                for conn, t in idle:
+                    if now - t > self._idle_timeout:
+                        conn.close()
+                idle.clear()
+                idle.extend(fresh)
+
+    def close(self) -> None:
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+    def connect(self, key: _PoolKey) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        conn_cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=self._timeout)
+
+
+class BaseTransport(ABC):
+    """
+    Sends GET requests to any number of hosts.
+
+    A single instance is safe to share between threads, and is meant to be
+    shared by everything that talks to a provider during a run.
+
+    Like `urllib.request.urlopen`, redirects are followed and responses with
+    an error status raise `urllib.error.HTTPError`.
+
+    Every request waits for the go-ahead from `rate_limiter`, which is told
+    about every response. Throttled requests are sent again once the rate
+    limiter allows, up to `MAX_THROTTLED_ATTEMPTS` times.
+
+    Subclasses implement sending a single request in `_request()`. The
+    responses they return must support the parts of `http.client.HTTPResponse`
+    that `PooledResponse` does, and their body must be read or the response
+    closed, to free what it holds.
+    """
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None):
+        self._rate_limiter = rate_limiter if rate_limiter is not None else AdaptiveRateLimiter()
+
+    def request(self, url: str, headers: Optional[dict] = None):
+        if headers is None:
+            headers = {}
+        redirects = 0
+        throttled = 0
+        while True:
+            self._rate_limiter.acquire()
+            res = self._request(url, headers)
+            self._rate_limiter.on_response(res.status, res.getheader('Retry-After'))
+
+            location = res.getheader('Location')
+            if res.status in REDIRECT_STATUSES and location is not None:
+                res.read()
+                redirects += 1
+                if redirects > MAX_REDIRECTS:
+                    raise GBooksDlHttpException(f'Too many redirects while requesting {url}')
+                url = urllib.parse.urljoin(url, location)
+            elif res.status in THROTTLED_STATUSES and throttled < MAX_THROTTLED_ATTEMPTS:
+                res.read()
+                throttled += 1
+            elif res.status >= 400:
+                body = res.read()
+                raise urllib.error.HTTPError(url, res.status, res.reason, res.headers, io.BytesIO(body))
+            else:
+                return res
+
+    def fetch(self, url: str, headers: Optional[dict] = None) -> BufferedResponse:
+        """
+        Like `request()`, but reads the whole body up front and releases the
+        connection straight away.
+        """
+        with self.request(url, headers) as res:
+            body = res.read()
+        return BufferedResponse(res.url, res.status, res.reason, res.headers, body)
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
+
+    @abstractmethod
+    def _request(self, url: str, headers: dict):
+        ...
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Transport(BaseTransport):
+    """
+    Sends GET requests over pooled HTTP/1.1 keep-alive connections, one
+    request per connection at a time.
+    """
+    def __init__(
+            self,
+            pool_size: int = 8,
+            idle_timeout: float = 30.0,
+            timeout: Optional[float] = None,
+            rate_limiter: Optional[AdaptiveRateLimiter] = None
+    ):
+        super().__init__(rate_limiter)
+        self._pool = ConnectionPool(pool_size, idle_timeout, timeout)
+
+    def close(self) -> None:
+        self._pool.close()
+
+    def _request(self, url: str, headers: dict) -> PooledResponse:
+        key, target = split_url(url)
+        headers = {k: str(v) for k, v in headers.items()}
+
+        conn, reused = self._pool.acquire(key)
+        try:
+            res = self._send(conn, target, headers)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+            # The server dropped the idle connection, so retry on a fresh one.
+            conn = self._pool.connect(key)
+            res = self._send(conn, target, headers)
+        return PooledResponse(self._pool, key, conn, res, url)
+
+    @staticmethod
+    def _send(conn: http.client.HTTPConnection, target: str, headers: dict) -> http.client.HTTPResponse:
+        try:
+            conn.request('GET', target, headers=headers)
+            return conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+
+
+def split_url(url: str) -> tuple[_PoolKey, str]:
+    """
+    Splits `url` into the scheme, host and port of its origin, and its request target.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    default_port = 443 if parsed.scheme == 'https' else 80
+    key = (parsed.scheme, parsed.hostname, parsed.port or default_port)
+    target = parsed.path or '/'
+    if parsed.query:
+        target += f'?{parsed.query}'
+    return key, target
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec('h2') is not None
+
+
+def new_transport(
+        pool_size: int = 8,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        http2: bool = False,
+        timeout: Optional[float] = None
+) -> BaseTransport:
+    """
+    Returns an HTTP/2 transport if `http2` is set and the h2 package is
+    installed, and an HTTP/1.1 one otherwise. Hosts which don't speak HTTP/2
+    are sent requests over HTTP/1.1 either way.
+
+    Requests which get no response, or stop receiving their body, for
+    `timeout` seconds fail with a `TimeoutError`.
+    """
+    if http2:
+        if http2_available():
+            from gbooks_dl.http2 import Http2Transport
+            return Http2Transport(pool_size=pool_size, timeout=timeout, rate_limiter=rate_limiter)
+        log_err("HTTP/2 needs the h2 package (pip install 'gbooks-dl[http2]'), falling back to HTTP/1.1\n")
+    return Transport(pool_size=pool_size, timeout=timeout, rate_limiter=rate_limiter)
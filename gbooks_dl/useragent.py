@@ -0,0 +1,37 @@
+"""
+Random browser user agents.
+
+The Chrome versions to pick from take up a few thousand entries, so they are
+kept in a compact data file and only read the first time a user agent is needed.
+"""
+import random
+import functools
+from pathlib import Path
+
+_USER_AGENT_TPL = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/%s Safari/537.36'
+)
+
+CHROME_VERSIONS_PATH = Path(__file__).parent / 'data' / 'chrome_versions.txt'
+
+
+@functools.cache
+def chrome_versions() -> tuple[str, ...]:
+    """
+    Expands each line of the data file, a build followed by the ranges of its
+    patch numbers (e.g. '74.0.3729 0-3,5'), into the versions it stands for.
+    """
+    versions = []
+    for line in CHROME_VERSIONS_PATH.read_text().splitlines():
+        if not line or line.startswith('#'):
+            continue
+        build, patches = line.split()
+        for patch_range in patches.split(','):
+            first, _, last = patch_range.partition('-')
+            versions.extend(f'{build}.{patch}' for patch in range(int(first), int(last or first) + 1))
+    return tuple(versions)
+
+
+def random_user_agent() -> str:
+    return _USER_AGENT_TPL % random.choice(chrome_versions())
@@ -4,6 +4,11 @@ setup(
     name='gbooks-dl',
     version='0.0.1',
     packages=find_packages(),
+    package_data={'gbooks_dl': ['data/*.txt']},
+    extras_require={
+        # Lets --http2 multiplex requests over one connection per host
+        'http2': ['h2>=4'],
+    },
     url='https://github.com/moosejaw/gbooks-dl',
     author='Josh Demir',
     author_email='josh@akinji.net',
@@ -0,0 +1,72 @@
+import time
+
+from gbooks_dl.cookiejar import CookieJar, StoredCookie, cookie_expiry
+
+
+def test_newer_cookie_replaces_older(tmp_path):
+    now = time.time()
+    first = CookieJar(tmp_path / 'cookies.json')
+    second = CookieJar(tmp_path / 'cookies.json')
+
+    first.save('google', [StoredCookie('NID', 'new', now + 3600, now)])
+    # A process which loaded the cookie before it was set again saves its older copy
+    second.save('google', [StoredCookie('NID', 'old', now + 3600, now - 60)])
+
+    assert first.load('google') == [StoredCookie('NID', 'new', now + 3600, now)]
+
+
+def test_saving_merges_cookies(tmp_path):
+    now = time.time()
+    jar = CookieJar(tmp_path / 'cookies.json')
+
+    jar.save('google', [StoredCookie('NID', '1', now + 3600, now)])
+    jar.save('google', [StoredCookie('SID', '2', now + 3600, now)])
+    jar.save('other', [StoredCookie('NID', '3', now + 3600, now)])
+
+    assert sorted(cookie.name for cookie in jar.load('google')) == ['NID', 'SID']
+    assert [cookie.value for cookie in jar.load('other')] == ['3']
+
+
+def test_expired_cookie_removes_older_copy(tmp_path):
+    now = time.time()
+    jar = CookieJar(tmp_path / 'cookies.json')
+
+    jar.save('google', [StoredCookie('NID', '1', now + 3600, now - 60)])
+    # The provider deleted it by setting it to expire in the past
+    jar.save('google', [StoredCookie('NID', '', now - 1, now)])
+
+    assert jar.load('google') == []
+    assert jar._read() == {}
+
+
+def test_session_cookie_kept_for_ttl(tmp_path):
+    now = time.time()
+    jar = CookieJar(tmp_path / 'cookies.json', session_ttl=600)
+
+    jar.save('google', [
+        StoredCookie('RECENT', '1', None, now - 300),
+        StoredCookie('STALE', '2', None, now - 900),
+    ])
+
+    assert [cookie.name for cookie in jar.load('google')] == ['RECENT']
+
+
+def test_unreadable_jar_starts_afresh(tmp_path):
+    (tmp_path / 'cookies.json').write_text('not json')
+    jar = CookieJar(tmp_path / 'cookies.json')
+    assert jar.load('google') == []
+
+    now = time.time()
+    jar.save('google', [StoredCookie('NID', '1', now + 3600, now)])
+    assert [cookie.name for cookie in jar.load('google')] == ['NID']
+
+
+def test_cookie_expiry():
+    now = 1_000_000.0
+    assert cookie_expiry(['Path=/'], now) is None
+    assert cookie_expiry(['Max-Age=60'], now) == now + 60
+    assert cookie_expiry(['Expires=Thu, 01 Jan 1970 00:00:10 GMT'], now) == 10
+    # Max-Age takes precedence over Expires, whichever comes first
+    assert cookie_expiry(['Max-Age=60', 'Expires=Thu, 01 Jan 1970 00:00:10 GMT'], now) == now + 60
+    assert cookie_expiry(['Expires=Thu, 01 Jan 1970 00:00:10 GMT', 'Max-Age=60'], now) == now + 60
+    assert cookie_expiry(['Max-Age=soon', 'Expires=garbage'], now) is None
@@ -0,0 +1,81 @@
+import gzip
+import zlib
+
+import pytest
+
+from gbooks_dl.decompress import decompress, get_decompressor, available_decompressors
+from gbooks_dl.exceptions import CannotDecompressResponseException
+
+# Compresses well, and decompresses to more than a chunk, so output is yielded in several pieces
+DATA = b''.join(b'page %d of the book\n' % n for n in range(20000))
+CHUNK_SIZE = 4096
+
+
+def _deflate_raw(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _brotli(data: bytes) -> bytes:
+    brotli = pytest.importorskip('brotli')
+    return brotli.compress(data)
+
+
+def _zstd(data: bytes) -> bytes:
+    zstandard = pytest.importorskip('zstandard')
+    return zstandard.ZstdCompressor().compress(data)
+
+
+COMPRESSORS = {
+    'gzip': gzip.compress,
+    'x-gzip': gzip.compress,
+    'deflate': zlib.compress,
+    'raw deflate': _deflate_raw,
+    'br': _brotli,
+    'zstd': _zstd,
+}
+ENCODINGS = {'raw deflate': 'deflate'}
+
+
+@pytest.fixture(params=list(COMPRESSORS))
+def compressed(request) -> tuple[str, bytes]:
+    encoding = ENCODINGS.get(request.param, request.param)
+    if encoding in ('br', 'zstd') and encoding not in available_decompressors():
+        pytest.skip(f'no library for {encoding} is installed')
+    return encoding, COMPRESSORS[request.param](DATA)
+
+
+def test_decompress_whole_body(compressed):
+    encoding, data = compressed
+    assert decompress(data, encoding) == DATA
+
+
+def test_decompress_in_pieces(compressed):
+    encoding, data = compressed
+    decompressor = get_decompressor(encoding)
+    output = []
+    for start in range(0, len(data), 1000):
+        output.extend(decompressor.decompress(data[start:start + 1000], CHUNK_SIZE))
+    output.append(decompressor.flush())
+    assert b''.join(output) == DATA
+
+
+@pytest.mark.parametrize('name', ['gzip', 'deflate', 'raw deflate'])
+def test_zlib_limits_each_piece(name):
+    # Only zlib's limit is exact; brotli's is rounded up to its own buffer size
+    decompressor = get_decompressor(ENCODINGS.get(name, name))
+    data = COMPRESSORS[name](DATA)
+    pieces = list(decompressor.decompress(data, CHUNK_SIZE))
+    assert all(len(piece) <= CHUNK_SIZE for piece in pieces)
+    assert b''.join(pieces) + decompressor.flush() == DATA
+
+
+@pytest.mark.parametrize('encoding', [None, '', 'identity', ' Identity '])
+def test_no_encoding(encoding):
+    assert get_decompressor(encoding) is None
+    assert decompress(DATA, encoding) == DATA
+
+
+def test_unknown_encoding():
+    with pytest.raises(CannotDecompressResponseException):
+        get_decompressor('compress')
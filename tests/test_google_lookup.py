@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from gbooks_dl.books.base.page import Page
+from gbooks_dl.books.providers.google.book import _LookupDigest, _PageId
+from gbooks_dl.books.providers.google.exceptions import NoPagesInResponseException
+
+
+# How lookup responses were parsed before `_LookupDigest`, in three passes
+def _old_extract_pages(res: dict) -> dict:
+    rtn = {}
+    no_src_lim = 3
+    no_src_count = 0
+    for r_p in res['page']:
+        if r_p.get('src') is None:
+            no_src_count += 1
+            if no_src_lim == no_src_count:
+                break
+            continue
+        no_src_count = 0
+        page_id = _PageId.from_id_str(r_p['pid'])
+        rtn[page_id] = Page(url=r_p['src'], number=page_id)
+    return rtn
+
+
+def _old_max_src_page(res: dict):
+    pids = [_PageId.from_id_str(p['pid']) for p in res['page'] if p.get('src') is not None]
+    return max(pids) if pids else None
+
+
+def _old_max_page(res: dict):
+    return max(_PageId.from_id_str(r['pid']) for r in res['page'])
+
+
+def _random_response(rng: random.Random) -> dict:
+    pages = []
+    for _ in range(rng.randint(1, 30)):
+        pid = f"{rng.choice(['PP', 'PR', 'PA', 'PT'])}{rng.randint(1, 400)}"
+        page = {'pid': pid}
+        if rng.random() < 0.6:
+            page['src'] = f'https://books.example/content?pg={pid}'
+        pages.append(page)
+    return {'page': pages}
+
+
+def _assert_matches_old(res: dict) -> None:
+    digest = _LookupDigest.from_json(res)
+    assert digest.pages == _old_extract_pages(res)
+    assert list(digest.pages) == list(_old_extract_pages(res))
+    assert digest.max_src_page == _old_max_src_page(res)
+    assert digest.max_page == _old_max_page(res)
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_digest_matches_old_parsing(seed):
+    _assert_matches_old(_random_response(random.Random(seed)))
+
+
+def test_sources_run_out_after_three_missing():
+    src = 'https://books.example/content?pg={}'
+    res = {'page': [
+        {'pid': 'PA1', 'src': src.format('PA1')},
+        {'pid': 'PA2'},
+        {'pid': 'PA3'},
+        {'pid': 'PA4', 'src': src.format('PA4')},
+        {'pid': 'PA5'},
+        {'pid': 'PA6'},
+        {'pid': 'PA7'},
+        {'pid': 'PA8', 'src': src.format('PA8')},
+        {'pid': 'PA200'},
+    ]}
+    _assert_matches_old(res)
+    digest = _LookupDigest.from_json(res)
+    assert [str(page_id) for page_id in digest.pages] == ['PA1', 'PA4']
+    assert str(digest.max_src_page) == 'PA8'
+    assert str(digest.max_page) == 'PA200'
+
+
+def test_no_sources():
+    res = {'page': [{'pid': 'PP3'}, {'pid': 'PA1'}]}
+    _assert_matches_old(res)
+    digest = _LookupDigest.from_json(res)
+    assert digest.pages == {}
+    assert digest.max_src_page is None
+
+
+def test_no_pages():
+    with pytest.raises(NoPagesInResponseException):
+        _LookupDigest.from_json({})
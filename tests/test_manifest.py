@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from benchmarks.server import BookConfig, start_server
+from gbooks_dl.pipeline import pipeline
+from gbooks_dl.books.base.manifest import Manifest
+from gbooks_dl.books.providers.google.book import BASE_URL_ENV_VAR
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    server = start_server(BookConfig(pages=6, front_pages=0, window=4, image_size=1024))
+    monkeypatch.setenv(BASE_URL_ENV_VAR, server.base_url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_manifest_of_another_book_is_ignored(tmp_path):
+    (tmp_path / 'PA1.jpeg').write_bytes(b'first book')
+    Manifest(tmp_path, 'FIRST').record('PA1', tmp_path / 'PA1.jpeg')
+
+    manifest = Manifest(tmp_path, 'SECOND')
+    assert manifest.get('PA1') is None
+    assert not manifest.is_complete('PA1')
+    assert Manifest(tmp_path, 'FIRST').get('PA1') is None
+
+
+def test_two_books_in_one_folder(tmp_path, stand_in):
+    pipeline('https://books.google.com/books?id=FIRST', tmp_path)
+    pipeline('https://books.google.com/books?id=SECOND', tmp_path)
+
+    for book_id in ('FIRST', 'SECOND'):
+        book_dest = tmp_path / book_id
+        with open(book_dest / Manifest.FILENAME, encoding='utf-8') as f:
+            header, *entries = [json.loads(line) for line in f]
+        assert header == {'book': book_id}
+        assert sorted(entry['page'] for entry in entries) == [f'PA{n}' for n in range(1, 7)]
+        assert sorted(fp.name for fp in book_dest.glob('*.jpeg')) == [f'PA{n}.jpeg' for n in range(1, 7)]
+    assert stand_in.stats.images == 12
@@ -0,0 +1,92 @@
+import pytest
+
+from gbooks_dl import ratelimit
+from gbooks_dl.ratelimit import AdaptiveRateLimiter, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+
+def test_healthy_responses_increase_rate_additively(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, max_rate=50.0, increase=1.0)
+    # Each response adds increase / rate, so a second's worth of them adds about `increase`
+    for _ in range(10):
+        limiter.on_response(200)
+    assert 10.9 < limiter.rate < 11.0
+
+
+def test_rate_is_capped(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, max_rate=12.0)
+    for _ in range(1000):
+        limiter.on_response(200)
+    assert limiter.rate == 12.0
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_throttling_decreases_rate_multiplicatively(clock, status):
+    limiter = AdaptiveRateLimiter(rate=10.0, min_rate=1.0, decrease=0.5)
+    limiter.on_response(status)
+    assert limiter.rate == 5.0
+    limiter.on_response(status)
+    assert limiter.rate == 2.5
+    for _ in range(10):
+        limiter.on_response(status)
+    assert limiter.rate == 1.0
+
+
+def test_errors_leave_rate_alone(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0)
+    limiter.on_response(404)
+    limiter.on_response(500)
+    assert limiter.rate == 10.0
+
+
+def test_throttling_empties_bucket(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, decrease=0.5, burst=5)
+    assert limiter.reserve() == 0
+    limiter.on_response(429)
+    # The next token takes a whole interval at the new rate of 5 requests per second
+    assert limiter.reserve() == pytest.approx(0.2)
+
+
+def test_bucket_allows_burst_then_paces(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=3)
+    assert [limiter.reserve() for _ in range(3)] == [0, 0, 0]
+    assert limiter.reserve() == pytest.approx(0.1)
+    assert limiter.reserve() == pytest.approx(0.2)
+    clock.sleep(1.0)
+    assert limiter.reserve() == 0
+
+
+def test_retry_after_pauses_requests(clock):
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=10)
+    limiter.on_response(429, '30')
+    assert limiter.reserve() == pytest.approx(30.0)
+    clock.sleep(30.0)
+    assert limiter.reserve() < 1.0
+
+
+def test_parse_retry_after(clock):
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(' 120 ') == 120.0
+    assert parse_retry_after('soon') is None
+    clock.now = 0.0
+    assert parse_retry_after('Thu, 01 Jan 1970 00:01:00 GMT') == 60.0
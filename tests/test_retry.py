@@ -0,0 +1,72 @@
+import socket
+import http.client
+import urllib.error
+
+import pytest
+
+from gbooks_dl.retry import RetryPolicy
+
+
+@pytest.mark.parametrize('retry', range(1, 10))
+def test_backoff_within_bounds(retry):
+    policy = RetryPolicy(backoff_base=0.5, backoff_cap=4.0)
+    bound = min(4.0, 0.5 * 2 ** (retry - 1))
+    waits = [policy.backoff(retry) for _ in range(200)]
+    assert all(0 <= wait <= bound for wait in waits)
+    # Full jitter spreads the waits over the whole range
+    assert max(waits) > bound / 2
+
+
+def test_call_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    policy = RetryPolicy(max_attempts=3)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ConnectionResetError()
+
+    with pytest.raises(ConnectionResetError):
+        policy.call(fail)
+    assert len(calls) == 3
+
+
+def test_call_counts_earlier_attempts(monkeypatch):
+    monkeypatch.setattr('time.sleep', lambda seconds: None)
+    policy = RetryPolicy(max_attempts=3)
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        policy.call(fail, attempts_made=2)
+    assert len(calls) == 1
+
+
+def _http_error(code: int) -> urllib.error.HTTPError:
+    return urllib.error.HTTPError('https://books.example', code, '', None, None)
+
+
+@pytest.mark.parametrize('exc', [
+    _http_error(500),
+    _http_error(502),
+    ConnectionResetError(),
+    TimeoutError(),
+    socket.timeout(),
+    http.client.IncompleteRead(b'', 10),
+])
+def test_retryable(exc):
+    assert RetryPolicy.is_retryable(exc)
+
+
+@pytest.mark.parametrize('exc', [
+    _http_error(404),
+    # Throttled requests are sent again by the transport
+    _http_error(429),
+    _http_error(503),
+    ValueError(),
+])
+def test_not_retryable(exc):
+    assert not RetryPolicy.is_retryable(exc)